@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+import datetime
+import decimal
+import operator
+from array import array
+from itertools import accumulate
+from typing import Any, Optional
+
+from django.db.models import QuerySet
+from django.utils import timezone
+
+from usermanagement.models import AuthAcc
+
+from . import category_tree
+from .models import DailyRollup, MonthlyRollup, Rollup
+from .money import MINOR_UNIT, CentsSum, from_cents
+
+PERIODS = ("day", "week", "month")
+
+WINDOWS = (30, 90)  # Days covered by the rolling averages
+
+DEFAULT_DAYS = 365
+MAX_DAYS = 3660
+
+# Bounds leaving room for the rolling windows before a range and the day after it
+EARLIEST = datetime.date.min + datetime.timedelta(days=max(WINDOWS) - 1)
+LATEST = datetime.date.max - datetime.timedelta(days=1)
+
+KINDS = (Rollup.INCOME, Rollup.EXPENSE)
+
+
+def _period_start(day: datetime.date, period: str) -> datetime.date:
+    if period == "week":
+        return day - datetime.timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def _rollups(model: type[Rollup], user: AuthAcc, categories: Optional[frozenset[int]]) -> QuerySet:
+    queryset = model.objects.for_user(user)
+    if categories is not None:
+        queryset = queryset.filter(category_id__in=categories)
+    return queryset
+
+
+def _cents_by_kind(queryset: QuerySet) -> dict[str, int]:
+    rows = queryset.values_list("kind").annotate(cents=CentsSum("total")).order_by()
+    return dict(rows)
+
+
+def _opening_balance(
+    user: AuthAcc, date_from: datetime.date, categories: Optional[frozenset[int]]
+) -> int:
+    """Net cents of everything before ``date_from``: whole months from the monthly
+    rollups, the rest of the current month from the daily ones.
+    """
+    month = date_from.replace(day=1)
+    before = _cents_by_kind(_rollups(MonthlyRollup, user, categories).filter(date__lt=month))
+    within = _cents_by_kind(
+        _rollups(DailyRollup, user, categories).filter(date__gte=month, date__lt=date_from)
+    )
+    return sum(
+        sign * (before.get(kind, 0) + within.get(kind, 0))
+        for kind, sign in zip(KINDS, (1, -1))
+    )
+
+
+def _daily_cents(
+    user: AuthAcc,
+    start: datetime.date,
+    end: datetime.date,
+    categories: Optional[frozenset[int]],
+) -> dict[str, array]:
+    """Income and expense cents per day from ``start`` to ``end``, one slot per day.
+
+    A single grouped query over the daily rollups fills two ``array('q')``; days
+    without transactions stay 0.
+    """
+    days = (end - start).days + 1
+    cents = {kind: array("q", bytes(8 * days)) for kind in KINDS}
+    rows = (
+        _rollups(DailyRollup, user, categories)
+        .filter(date__gte=start, date__lte=end)
+        .values_list("kind", "date")
+        .annotate(cents=CentsSum("total"))
+        .order_by()
+    )
+    for kind, day, total in rows:
+        cents[kind][(day - start).days] = total
+    return cents
+
+
+def _average(cents: int, days: int) -> decimal.Decimal:
+    return (from_cents(cents) / days).quantize(MINOR_UNIT)
+
+
+def parse_category_param(value: Optional[str], user: AuthAcc) -> Optional[frozenset[int]]:
+    """Resolve a ``?category=<id>`` parameter into the ids of its subtree.
+
+    Raises:
+        ValueError: If the value is not the id of a category visible to ``user``.
+    """
+    if not value:
+        return None
+    try:
+        category_id = int(value)
+    except ValueError:
+        raise ValueError("Invalid 'category', expected a category id")
+    tree = category_tree.get_tree(user)
+    if category_id not in tree:
+        raise ValueError("Category does not exist")
+    return tree.subtree(category_id)
+
+
+def build_analytics(
+    user: AuthAcc,
+    period: Optional[str] = None,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+    categories: Optional[frozenset[int]] = None,
+) -> dict[str, Any]:
+    """Build income, expense and net series with a running balance and rolling averages.
+
+    Daily totals for the range, plus the longest rolling window before it, are read
+    from the daily rollups in one grouped query into integer-cent arrays. Prefix
+    sums over those arrays give every bucket total, balance and window average by
+    subtraction, so the cost depends on the number of days, not of transactions.
+
+    Args:
+        user (AuthAcc): The owner of the ledger.
+        period (str, optional): One of ``PERIODS``. Defaults to ``day``.
+        date_from (date, optional): First day. Defaults to ``DEFAULT_DAYS`` before ``date_to``.
+        date_to (date, optional): Last day. Defaults to today.
+        categories (frozenset[int], optional): Only count these categories.
+
+    Raises:
+        ValueError: If ``period`` is not supported, or the range is empty, too long or
+            too close to the earliest or latest representable date.
+
+    Returns:
+        dict[str, Any]: The series, one entry per period, and the opening balance.
+            Each entry holds the ``income``, ``expense`` and ``net`` of the period, the
+            ``balance`` at its end and the ``<kind>_avg_<days>`` daily averages over
+            the ``WINDOWS`` ending with it.
+    """
+    period = period or "day"
+    if period not in PERIODS:
+        raise ValueError(f"Invalid period, expected one of {', '.join(PERIODS)}")
+    date_to = date_to or timezone.localdate()
+    if (date_from or date_to) < EARLIEST or date_to > LATEST:
+        raise ValueError(f"Dates must be between {EARLIEST} and {LATEST}")
+    default_span = datetime.timedelta(days=DEFAULT_DAYS - 1)
+    date_from = date_from or max(date_to, EARLIEST + default_span) - default_span
+    if date_from > date_to:
+        raise ValueError("'from' must not be after 'to'")
+    if (date_to - date_from).days >= MAX_DAYS:
+        raise ValueError(f"Date range too long, at most {MAX_DAYS} days")
+
+    # Read the longest window ahead of the range, so the first averages are complete
+    offset = max(WINDOWS) - 1
+    start = date_from - datetime.timedelta(days=offset)
+    cents = _daily_cents(user, start, date_to, categories)
+    net = array("q", map(operator.sub, cents[Rollup.INCOME], cents[Rollup.EXPENSE]))
+    # prefix[name][i] is the sum of the first i days
+    daily = {"income": cents[Rollup.INCOME], "expense": cents[Rollup.EXPENSE], "net": net}
+    prefix = {name: array("q", accumulate(values, initial=0)) for name, values in daily.items()}
+    opening = _opening_balance(user, date_from, categories)
+
+    series = []
+    days = (date_to - date_from).days + 1
+    first = offset
+    for index in range(offset, offset + days):
+        day = date_from + datetime.timedelta(days=index - offset)
+        following = day + datetime.timedelta(days=1)
+        last = index + 1 == offset + days
+        if not last and _period_start(following, period) == _period_start(day, period):
+            continue
+        # ``index`` is the last day of a bucket that started at ``first``
+        end = index + 1
+        point: dict[str, Any] = {"period": _period_start(day, period)}
+        for name, sums in prefix.items():
+            point[name] = from_cents(sums[end] - sums[first])
+        point["balance"] = from_cents(opening + prefix["net"][end] - prefix["net"][offset])
+        for window in WINDOWS:
+            for name, sums in prefix.items():
+                point[f"{name}_avg_{window}"] = _average(sums[end] - sums[end - window], window)
+        series.append(point)
+        first = end
+
+    return {
+        "period": period,
+        "from": date_from,
+        "to": date_to,
+        "opening_balance": from_cents(opening),
+        "series": series,
+    }
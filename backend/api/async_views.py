@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import functools
+import json
+from typing import Any, Callable, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.utils.encoders import JSONEncoder
+from rest_framework_simplejwt.exceptions import InvalidToken
+
+from usermanagement.middleware import CookieJWTAuthentication
+
+from . import cache, rollups
+from .cache import cached_response
+from .models import Category, Expense, Income
+from .money import parse_amount
+from .pagination import aledger_page
+from .reports import abuild_report, is_true, parse_date_param
+
+# Async variants of the list, create and report endpoints. Served over ASGI (see
+# gunicorn.conf.py), a request waiting on the database or a slow client holds no
+# worker thread; only the transactional writes run in one.
+
+
+def _json(data: Any, status: int = 200) -> JsonResponse:
+    # The encoder of the sync views, so both render amounts the same way
+    return JsonResponse(data, status=status, safe=False, encoder=JSONEncoder)
+
+
+def authenticated(view: Callable[..., Any]) -> Callable[..., Any]:
+    """Require a valid JWT, like ``IsAuthenticated`` on the sync views."""
+
+    @functools.wraps(view)
+    async def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        try:
+            result = await CookieJWTAuthentication().aauthenticate(request)
+        except (AuthenticationFailed, InvalidToken) as e:
+            detail = e.detail if isinstance(e.detail, dict) else {'detail': e.detail}
+            return _json(detail, status=401)
+        if result is None:
+            return _json({'detail': 'Authentication credentials were not provided.'}, status=401)
+        request.user = result[0]
+        return await view(request, *args, **kwargs)
+
+    return wrapper
+
+
+@authenticated
+@cached_response('report')
+async def get_report(request: HttpRequest) -> HttpResponse:
+    params = request.GET
+    try:
+        report = await abuild_report(
+            request.user,
+            period=params.get('period'),
+            details=is_true(params.get('details')),
+            date_from=parse_date_param(params.get('from'), 'from'),
+            date_to=parse_date_param(params.get('to'), 'to'),
+        )
+    except ValueError as e:
+        return _json({'error': str(e)}, status=400)
+    return _json(report)
+
+
+def _create(model: type[Income] | type[Expense], user: Any, **fields: Any) -> Income | Expense:
+    with transaction.atomic():
+        entry = model.objects.create(user_id=user.pk, **fields)
+        rollups.record(entry)
+    cache.invalidate(user)
+    return entry
+
+
+@method_decorator(csrf_exempt, name='dispatch')
+@method_decorator(authenticated, name='dispatch')
+class LedgerView(View):
+    """List and create incomes or expenses, depending on ``model``."""
+
+    model: Optional[type[Income] | type[Expense]] = None
+
+    async def get(self, request: HttpRequest) -> HttpResponse:
+        try:
+            page = await aledger_page(self.model.objects.for_user(request.user), request.GET)
+        except ValueError as e:
+            return _json({'error': str(e)}, status=400)
+        return _json(page)
+
+    async def post(self, request: HttpRequest) -> HttpResponse:
+        try:
+            data = json.loads(request.body or b'{}')
+        except json.JSONDecodeError:
+            return _json({'error': 'Invalid JSON'}, status=400)
+        if not isinstance(data, dict):
+            return _json({'error': 'Expected a JSON object'}, status=400)
+        amount = data.get('amount')
+        date = data.get('date')
+        category_name = data.get('category')
+        description = data.get('description', '')
+        user = request.user
+
+        if not all([amount, date, category_name]):
+            return _json({'error': 'Amount, date, and category are required'}, status=400)
+
+        try:
+            amount = parse_amount(amount)
+            date = parse_date_param(date, 'date')
+        except (TypeError, ValueError):
+            return _json({'error': 'Invalid amount or date'}, status=400)
+
+        try:
+            category = await Category.objects.for_user(user).aget(name=category_name)
+        except Category.DoesNotExist:
+            return _json({'error': 'Category does not exist'}, status=400)
+
+        # Transactions are not available to async code, so the insert and the rollup
+        # update run together in a thread
+        entry = await sync_to_async(_create)(
+            self.model,
+            user,
+            amount=amount,
+            date=date,
+            category=category,
+            description=description,
+        )
+        return _json({'id': entry.id, 'amount': entry.amount}, status=201)
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import datetime
+import decimal
+from collections import defaultdict
+from typing import Any, Mapping, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import DecimalField, F, FilteredRelation, Q, QuerySet, Value
+from django.db.models.functions import Coalesce
+
+from usermanagement.models import AuthAcc
+
+from . import category_tree
+from .models import (
+    AMOUNT_PLACES,
+    TOTAL_DIGITS,
+    Budget,
+    BudgetSpend,
+    MonthlyRollup,
+    Rollup,
+)
+
+ZERO = decimal.Decimal(0)
+
+
+def _covering(tree: category_tree.CategoryTree, category_id: int) -> tuple[int, ...]:
+    """The category and its ancestors: the budgets an expense in it counts against."""
+    if category_id not in tree:
+        return ()
+    return (category_id, *tree.ancestors[category_id])
+
+
+def _bump(budget_id: int, month: datetime.date, amount: decimal.Decimal) -> None:
+    lookup = {"budget_id": budget_id, "month": month}
+    if BudgetSpend.objects.filter(**lookup).update(spent=F("spent") + amount):
+        return
+    try:
+        with transaction.atomic():
+            BudgetSpend.objects.create(**lookup, spent=amount)
+    except IntegrityError:
+        # Another request created the row first
+        BudgetSpend.objects.filter(**lookup).update(spent=F("spent") + amount)
+
+
+def apply(
+    spent: Mapping[tuple[int, Optional[int], datetime.date], decimal.Decimal], sign: int = 1
+) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) expenses from the budget counters.
+
+    Args:
+        spent: Expense totals keyed by user, category and month, as grouped for the
+            monthly rollups.
+        sign (int, optional): 1 for new expenses, -1 for deleted ones.
+    """
+    users = {int(user_id) for user_id, category_id, month in spent if category_id is not None}
+    if not users:
+        return
+    budgets = {
+        (user_id, category_id): budget_id
+        for budget_id, user_id, category_id in Budget.objects.filter(user_id__in=users)
+        .values_list("id", "user_id", "category_id")
+    }
+    if not budgets:
+        return
+
+    counters: dict[tuple[int, datetime.date], decimal.Decimal] = defaultdict(decimal.Decimal)
+    trees: dict[int, category_tree.CategoryTree] = {}
+    for (user_id, category_id, month), total in spent.items():
+        if category_id is None:
+            continue
+        user_id = int(user_id)  # Unsaved instances hold whatever id they were given
+        if user_id not in trees:
+            trees[user_id] = category_tree.get_tree(AuthAcc(pk=user_id))
+        for covering in _covering(trees[user_id], category_id):
+            budget_id = budgets.get((user_id, covering))
+            if budget_id is not None:
+                counters[budget_id, month] += total
+
+    for (budget_id, month), total in counters.items():
+        _bump(budget_id, month, sign * total)
+
+
+def status(
+    user: AuthAcc, month: datetime.date, category_ids: Optional[tuple[int, ...]] = None
+) -> list[dict[str, Any]]:
+    """The budgets of ``user`` with their spend and remaining amount in ``month``.
+
+    Reads the counters with one query, whatever the number of expenses.
+
+    Args:
+        user (AuthAcc): The owner of the budgets.
+        month (date): Any day of the month.
+        category_ids (tuple[int, ...], optional): Only the budgets on these categories.
+    """
+    budgets: QuerySet = Budget.objects.for_user(user)
+    if category_ids is not None:
+        budgets = budgets.filter(category_id__in=category_ids)
+    month = month.replace(day=1)
+    rows = (
+        budgets.annotate(current=FilteredRelation("spends", condition=Q(spends__month=month)))
+        .annotate(
+            spent=Coalesce(
+                "current__spent",
+                Value(ZERO),
+                output_field=DecimalField(max_digits=TOTAL_DIGITS, decimal_places=AMOUNT_PLACES),
+            )
+        )
+        .values("id", "category_id", "category__name", "amount", "spent")
+        .order_by("id")
+    )
+    return [
+        {
+            "id": row["id"],
+            "category": row["category__name"],
+            "month": month,
+            "budget": row["amount"],
+            "spent": row["spent"],
+            "remaining": row["amount"] - row["spent"],
+        }
+        for row in rows
+    ]
+
+
+def remaining(
+    user: AuthAcc, category_id: Optional[int], date: datetime.date
+) -> list[dict[str, Any]]:
+    """The budgets an expense in ``category_id`` on ``date`` counts against."""
+    if category_id is None:
+        return []
+    covering = _covering(category_tree.get_tree(user), category_id)
+    return status(user, date, covering) if covering else []
+
+
+def reconcile(budgets: Optional[QuerySet] = None) -> int:
+    """Recompute budget counters from the monthly expense rollups and fix any drift.
+
+    Each user is handled in a transaction that first locks their counters, so an
+    expense written meanwhile either waits and is added on top of the repaired
+    value, or is already part of the rollups read.
+
+    Args:
+        budgets (QuerySet, optional): Limit the repair to these budgets. Defaults to all.
+
+    Returns:
+        int: The number of counters created or changed.
+    """
+    budgets = Budget.objects.all() if budgets is None else budgets
+    per_user: dict[int, dict[int, int]] = defaultdict(dict)
+    for budget_id, user_id, category_id in budgets.values_list("id", "user_id", "category_id"):
+        per_user[user_id][category_id] = budget_id
+
+    repaired = 0
+    for user_id, by_category in per_user.items():
+        tree = category_tree.get_tree(AuthAcc(pk=user_id))
+        with transaction.atomic():
+            existing = {
+                (spend.budget_id, spend.month): spend
+                for spend in BudgetSpend.objects.select_for_update().filter(
+                    budget_id__in=by_category.values()
+                )
+            }
+            expected: dict[tuple, decimal.Decimal] = defaultdict(decimal.Decimal)
+            rollups = (
+                MonthlyRollup.objects.filter(user_id=user_id, kind=Rollup.EXPENSE)
+                .filter(category__isnull=False)
+                .values_list("category_id", "date", "total")
+            )
+            for category_id, month, total in rollups:
+                for covering in _covering(tree, category_id):
+                    if covering in by_category:
+                        expected[by_category[covering], month] += total
+
+            changed = []
+            for key, spend in existing.items():
+                spent = expected.pop(key, ZERO)
+                if spend.spent != spent:
+                    spend.spent = spent
+                    changed.append(spend)
+            created = [
+                BudgetSpend(budget_id=budget_id, month=month, spent=spent)
+                for (budget_id, month), spent in expected.items()
+            ]
+            BudgetSpend.objects.bulk_update(changed, ["spent"])
+            BudgetSpend.objects.bulk_create(created)
+            repaired += len(changed) + len(created)
+    return repaired
@@ -0,0 +1,148 @@
+from __future__ import annotations
+
+import functools
+import hashlib
+import inspect
+from typing import Any, Callable
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpRequest, HttpResponse
+from rest_framework.request import Request
+from rest_framework.response import Response
+
+from usermanagement.models import AuthAcc
+
+VERSION_KEY = "response:version:{}"
+RESPONSE_KEY = "response:{namespace}:{user}:{version}:{params}"
+STATS_KEY = "response:stats:{namespace}:{outcome}"
+
+HIT = "hits"
+MISS = "misses"
+
+
+def _version(user_id: int) -> int:
+    return cache.get(VERSION_KEY.format(user_id), 0)
+
+
+async def _aversion(user_id: int) -> int:
+    return await cache.aget(VERSION_KEY.format(user_id), 0)
+
+
+def _count(namespace: str, outcome: str) -> None:
+    key = STATS_KEY.format(namespace=namespace, outcome=outcome)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+async def _acount(namespace: str, outcome: str) -> None:
+    key = STATS_KEY.format(namespace=namespace, outcome=outcome)
+    await cache.aadd(key, 0, timeout=None)
+    try:
+        await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=None)
+
+
+def _params_digest(request: HttpRequest | Request) -> str:
+    params = sorted(request.GET.lists())
+    return hashlib.sha1(repr(params).encode()).hexdigest()
+
+
+def invalidate(user: AuthAcc) -> None:
+    """Drop every cached response of ``user`` by moving to a new version.
+
+    Old entries are never read again and expire on their own.
+    """
+    key = VERSION_KEY.format(user.pk)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, timeout=None)
+
+
+def stats() -> dict[str, dict[str, int]]:
+    """Hit and miss counters per cached endpoint."""
+    keys = {
+        (namespace, outcome): STATS_KEY.format(namespace=namespace, outcome=outcome)
+        for namespace in settings.RESPONSE_CACHE_TTLS
+        for outcome in (HIT, MISS)
+    }
+    values = cache.get_many(list(keys.values()))
+    return {
+        namespace: {outcome: values.get(keys[namespace, outcome], 0) for outcome in (HIT, MISS)}
+        for namespace in settings.RESPONSE_CACHE_TTLS
+    }
+
+
+def cached_response(namespace: str) -> Callable:
+    """Cache successful responses of a view per user and query string.
+
+    The TTL is ``RESPONSE_CACHE_TTLS[namespace]``; a TTL of 0 disables caching. Writes
+    call ``invalidate`` so cached responses never outlive the data they were built from.
+    Async views are cached as rendered JSON through the async cache API.
+    """
+
+    def decorator(view: Callable[..., Response]) -> Callable[..., Response]:
+        if inspect.iscoroutinefunction(view):
+            return _async_decorator(namespace, view)
+
+        @functools.wraps(view)
+        def wrapper(request: Request, *args: Any, **kwargs: Any) -> Response:
+            ttl = settings.RESPONSE_CACHE_TTLS.get(namespace, 0)
+            if not ttl or not request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+
+            user_id = request.user.pk
+            key = RESPONSE_KEY.format(
+                namespace=namespace,
+                user=user_id,
+                version=_version(user_id),
+                params=_params_digest(request),
+            )
+            data = cache.get(key)
+            if data is not None:
+                _count(namespace, HIT)
+                return Response(data)
+
+            _count(namespace, MISS)
+            response = view(request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, timeout=ttl)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def _async_decorator(namespace: str, view: Callable[..., Any]) -> Callable[..., Any]:
+    @functools.wraps(view)
+    async def wrapper(request: HttpRequest, *args: Any, **kwargs: Any) -> HttpResponse:
+        ttl = settings.RESPONSE_CACHE_TTLS.get(namespace, 0)
+        if not ttl or not request.user.is_authenticated:
+            return await view(request, *args, **kwargs)
+
+        user_id = request.user.pk
+        key = RESPONSE_KEY.format(
+            namespace=f"{namespace}.json",  # Rendered, unlike the data sync views store
+            user=user_id,
+            version=await _aversion(user_id),
+            params=_params_digest(request),
+        )
+        content = await cache.aget(key)
+        if content is not None:
+            await _acount(namespace, HIT)
+            return HttpResponse(content, content_type="application/json")
+
+        await _acount(namespace, MISS)
+        response = await view(request, *args, **kwargs)
+        if response.status_code == 200:
+            await cache.aset(key, response.content, timeout=ttl)
+        return response
+
+    return wrapper
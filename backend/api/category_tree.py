@@ -0,0 +1,163 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from django.core.cache import cache
+
+from usermanagement.models import AuthAcc
+
+from .models import Category, MonthlyRollup
+from .money import ExactSum
+
+VERSION_KEY = "category-tree:version:{}"
+SHARED = "shared"  # Version of the categories without an owner (the default roots)
+
+NODE_FIELDS = ("id", "name", "description", "parent_id", "root")
+
+MAX_TREES = 1024  # Trees kept per process
+
+
+class CategoryTree:
+    """An immutable snapshot of the categories visible to one user.
+
+    Ancestors and descendants are precomputed when the tree is built, so lookups
+    are plain dictionary reads.
+    """
+
+    def __init__(self, version: tuple[int, int], nodes: list[dict[str, Any]]) -> None:
+        self.version = version
+        self.nodes: dict[int, dict[str, Any]] = {node["id"]: node for node in nodes}
+        self.children: dict[Optional[int], list[int]] = {}
+        for node in nodes:
+            parent = node["parent_id"] if node["parent_id"] in self.nodes else None
+            self.children.setdefault(parent, []).append(node["id"])
+
+        self.order = self._post_order()  # Children before their parents
+        self.ancestors: dict[int, tuple[int, ...]] = {}
+        self.descendants: dict[int, frozenset[int]] = {}
+        for category_id in self.order:
+            below = set()
+            for child in self.children.get(category_id, ()):
+                below.add(child)
+                below |= self.descendants[child]
+            self.descendants[category_id] = frozenset(below)
+        for category_id in reversed(self.order):
+            parent = self.nodes[category_id]["parent_id"]
+            if parent in self.nodes:
+                self.ancestors[category_id] = (parent, *self.ancestors[parent])
+            else:
+                self.ancestors[category_id] = ()
+
+    def _post_order(self) -> list[int]:
+        order: list[int] = []
+        stack = [(category_id, False) for category_id in self.children.get(None, ())]
+        while stack:
+            category_id, expanded = stack.pop()
+            if expanded:
+                order.append(category_id)
+                continue
+            stack.append((category_id, True))
+            stack.extend((child, False) for child in self.children.get(category_id, ()))
+        return order
+
+    def __contains__(self, category_id: int) -> bool:
+        return category_id in self.nodes
+
+    def subtree(self, category_id: int) -> frozenset[int]:
+        """The category and all of its descendants."""
+        return self.descendants[category_id] | {category_id}
+
+    def roll_up(self, totals: dict[int, float]) -> dict[int, float]:
+        """Sum per-category ``totals`` over every subtree."""
+        rolled: dict[int, float] = {}
+        for category_id in self.order:
+            rolled[category_id] = totals.get(category_id, 0) + sum(
+                rolled[child] for child in self.children.get(category_id, ())
+            )
+        return rolled
+
+    def as_nested(
+        self, parent: Optional[int] = None, **values: dict[int, Any]
+    ) -> list[dict[str, Any]]:
+        """Nest the nodes under their parents, attaching ``values`` per category."""
+        nested = []
+        for category_id in self.children.get(parent, ()):
+            node = dict(self.nodes[category_id])
+            for name, per_category in values.items():
+                node[name] = per_category.get(category_id, 0)
+            node["children"] = self.as_nested(category_id, **values)
+            nested.append(node)
+        return nested
+
+
+# Trees already built in this process, checked against the shared version counters
+_trees: dict[int, CategoryTree] = {}
+
+
+def _version(user_id: int) -> tuple[int, int]:
+    keys = [VERSION_KEY.format(SHARED), VERSION_KEY.format(user_id)]
+    versions = cache.get_many(keys)
+    return versions.get(keys[0], 0), versions.get(keys[1], 0)
+
+
+def _bump(owner: Any) -> None:
+    key = VERSION_KEY.format(owner)
+    cache.add(key, 0, timeout=None)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Evicted between add and incr
+        cache.set(key, 1, timeout=None)
+
+
+def get_tree(user: AuthAcc) -> CategoryTree:
+    """Return the category tree of ``user``, rebuilding it only after a change."""
+    version = _version(user.pk)
+    tree = _trees.get(user.pk)
+    if tree is None or tree.version != version:
+        nodes = Category.objects.for_user(user).values(*NODE_FIELDS)
+        tree = CategoryTree(version, list(nodes))
+        if len(_trees) >= MAX_TREES:
+            _trees.pop(next(iter(_trees)))
+        _trees[user.pk] = tree
+    return tree
+
+
+def invalidate(category: Category) -> None:
+    """Mark the trees that contain ``category`` as stale."""
+    _bump(category.user_id if category.user_id else SHARED)
+
+
+def load_subtree(category: Category) -> frozenset[int]:
+    """The category and all of its descendants, read from the database.
+
+    For writes, which must not trust a cached tree: one may be stale, and a category
+    created by another process is missing from it until its version is seen.
+    """
+    ids = {category.pk}
+    level = ids
+    while level:
+        level = set(
+            Category.objects.filter(parent_id__in=level).values_list("id", flat=True)
+        ) - ids
+        ids |= level
+    return frozenset(ids)
+
+
+def subtree_totals(user: AuthAcc) -> dict[str, dict[int, float]]:
+    """Income and expense totals of every category including its subtree.
+
+    Per-category totals come from a single grouped query over the monthly rollups;
+    the tree then adds them up bottom-up in memory.
+    """
+    tree = get_tree(user)
+    own: dict[str, dict[int, float]] = {MonthlyRollup.INCOME: {}, MonthlyRollup.EXPENSE: {}}
+    rows = (
+        MonthlyRollup.objects.for_user(user).filter(category__isnull=False)
+        .values("kind", "category_id")
+        .annotate(total=ExactSum("total"))
+        .order_by()
+    )
+    for row in rows:
+        own[row["kind"]][row["category_id"]] = row["total"]
+    return {kind: tree.roll_up(totals) for kind, totals in own.items()}
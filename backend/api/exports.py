@@ -0,0 +1,70 @@
+from __future__ import annotations
+
+import csv
+import datetime
+import json
+from typing import Any, Iterator, Optional
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from usermanagement.models import AuthAcc
+
+from .models import Expense, Income, Rollup
+
+EXPORT_FIELDS = ("id", "date", "amount", "category__name", "description")
+COLUMNS = ("kind", "id", "date", "amount", "category", "description")
+
+MODELS = {Rollup.INCOME: Income, Rollup.EXPENSE: Expense}
+
+CONTENT_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class Echo:
+    """A file-like object that returns what is written, for streaming ``csv`` output."""
+
+    def write(self, value: str) -> str:
+        return value
+
+
+def export_rows(
+    user: AuthAcc,
+    kinds: tuple[str, ...],
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> Iterator[tuple[Any, ...]]:
+    """Yield ``COLUMNS`` tuples for the user's ledger, oldest first.
+
+    Rows are read through a server-side cursor in chunks of ``LEDGER_EXPORT_CHUNK_SIZE``
+    so only one chunk is held in memory at a time.
+    """
+    for kind in kinds:
+        queryset = MODELS[kind].objects.for_user(user)
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+        rows = queryset.order_by("date", "id").values_list(*EXPORT_FIELDS)
+        for row in rows.iterator(chunk_size=settings.LEDGER_EXPORT_CHUNK_SIZE):
+            yield (kind, *row)
+
+
+def stream_csv(rows: Iterator[tuple[Any, ...]]) -> Iterator[str]:
+    writer = csv.writer(Echo())
+    yield writer.writerow(COLUMNS)
+    for row in rows:
+        yield writer.writerow(row)
+
+
+def stream_ndjson(rows: Iterator[tuple[Any, ...]]) -> Iterator[str]:
+    for row in rows:
+        yield json.dumps(dict(zip(COLUMNS, row)), cls=JSONEncoder) + "\n"
+
+
+STREAMS = {
+    "csv": stream_csv,
+    "ndjson": stream_ndjson,
+}
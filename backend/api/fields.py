@@ -0,0 +1,43 @@
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from cryptography.fernet import InvalidToken
+from django.core.exceptions import ImproperlyConfigured
+from django.db.models import TextField
+
+from custom import decrypt, encrypt
+
+# Every Fernet token starts with its version byte, 0x80, which encodes to this
+TOKEN_PREFIX = "gAAAAA"
+
+
+class EncryptedTextField(TextField):
+    """A text column stored encrypted with the shared Fernet cipher.
+
+    Values are encrypted on save and decrypted when loaded, using the cipher cached
+    in ``custom.get_cipher``. Ciphertexts are not deterministic, so the column cannot
+    be filtered, ordered or indexed on its plaintext.
+
+    Values stored before the column was encrypted are read as they are, and encrypted
+    the next time the row is saved.
+    """
+
+    description = "Encrypted text"
+
+    def get_prep_value(self, value: Any) -> Optional[str]:
+        value = super().get_prep_value(value)
+        if value is None:
+            return None
+        return encrypt(value)
+
+    def from_db_value(self, value: Optional[str], expression: Any, connection: Any) -> Optional[str]:
+        if value is None or not value.startswith(TOKEN_PREFIX):
+            return value
+        try:
+            return decrypt(value)
+        except InvalidToken:
+            raise ImproperlyConfigured(
+                f"Could not decrypt {self.model.__name__}.{self.name}, add the key it was "
+                "encrypted with to ENCRYPTION_OLD_KEYS"
+            )
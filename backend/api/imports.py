@@ -0,0 +1,122 @@
+from __future__ import annotations
+
+import csv
+import io
+from typing import Any, Iterable, Mapping
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework.request import Request
+
+from usermanagement.models import AuthAcc
+
+from . import rollups
+from .models import Category, Expense, Income
+from .money import parse_amount
+from .reports import parse_date_param
+
+CSV_FIELDS = ("amount", "date", "category", "description")
+
+
+def read_rows(request: Request) -> list[Mapping[str, Any]]:
+    """Read the rows of an import request.
+
+    Accepts a JSON array of objects, a ``text/csv`` body, or a multipart upload with
+    the CSV in a ``file`` field. CSV input needs a header row naming ``CSV_FIELDS``.
+
+    Raises:
+        ValueError: If the payload is neither a list of objects nor a readable CSV.
+    """
+    if request.content_type.startswith("text/csv"):
+        return _read_csv(request.body)
+    upload = request.FILES.get("file")
+    if upload:
+        return _read_csv(upload.read())
+    data = request.data
+    if not isinstance(data, list) or not all(isinstance(row, dict) for row in data):
+        raise ValueError("Expected a JSON array of transactions or a CSV file")
+    return data
+
+
+def _read_csv(content: bytes) -> list[Mapping[str, Any]]:
+    try:
+        text = content.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise ValueError("CSV must be UTF-8 encoded")
+    reader = csv.DictReader(io.StringIO(text))
+    if not reader.fieldnames or not {"amount", "date", "category"} <= set(reader.fieldnames):
+        raise ValueError(f"CSV header must include {', '.join(CSV_FIELDS[:3])}")
+    return list(reader)
+
+
+def import_rows(
+    model: type[Income] | type[Expense],
+    user: AuthAcc,
+    rows: Iterable[Mapping[str, Any]],
+) -> dict[str, Any]:
+    """Validate and insert transactions in batches.
+
+    Category names are resolved with one query for the whole import. Invalid rows are
+    reported with their 1-based position and skipped; the valid ones are inserted with
+    ``bulk_create`` in chunks of ``LEDGER_IMPORT_BATCH_SIZE`` inside one transaction,
+    and added to the rollups together.
+
+    Raises:
+        ValueError: If there are no rows or more than ``LEDGER_IMPORT_MAX_ROWS``.
+
+    Returns:
+        dict[str, Any]: The number of ``created`` rows and the per-row ``errors``.
+    """
+    rows = list(rows)
+    if not rows:
+        raise ValueError("No transactions to import")
+    if len(rows) > settings.LEDGER_IMPORT_MAX_ROWS:
+        raise ValueError(
+            f"Too many transactions, at most {settings.LEDGER_IMPORT_MAX_ROWS} per import"
+        )
+
+    names = {
+        row["category"] for row in rows if isinstance(row.get("category"), str) and row["category"]
+    }
+    visible = Category.objects.for_user(user).filter(name__in=names)
+    categories = {category.name: category for category in visible}
+
+    valid: list[Income | Expense] = []
+    errors: list[dict[str, Any]] = []
+    for position, row in enumerate(rows, start=1):
+        amount = row.get("amount")
+        date = row.get("date")
+        category_name = row.get("category")
+        if amount in (None, "") or not date or not category_name:
+            errors.append({"row": position, "error": "Amount, date, and category are required"})
+            continue
+        if not isinstance(category_name, str):
+            errors.append({"row": position, "error": "Category must be a name"})
+            continue
+        try:
+            amount = parse_amount(amount)
+            date = parse_date_param(date, "date")
+        except (TypeError, ValueError):
+            errors.append({"row": position, "error": "Invalid amount or date"})
+            continue
+        category = categories.get(category_name)
+        if not category:
+            errors.append({"row": position, "error": "Category does not exist"})
+            continue
+        valid.append(
+            model(
+                amount=amount,
+                date=date,
+                category=category,
+                description=row.get("description") or "",
+                user_id=user.pk,
+            )
+        )
+
+    batch_size = settings.LEDGER_IMPORT_BATCH_SIZE
+    with transaction.atomic():
+        for start in range(0, len(valid), batch_size):
+            model.objects.bulk_create(valid[start : start + batch_size])
+        rollups.apply(model, valid)
+
+    return {"created": len(valid), "errors": errors}
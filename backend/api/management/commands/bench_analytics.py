@@ -0,0 +1,51 @@
+import datetime
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Max
+
+from usermanagement.models import AuthAcc
+
+from api.analytics import PERIODS, build_analytics
+from api.models import DailyRollup
+
+from .seed_ledger import SEED_DOMAIN
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the analytics series of a user over the last --days of their ledger, "
+        "for each period. Seed a large ledger first, e.g. "
+        "`seed_ledger --users 1 --rows 1000000`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="email",
+            default=f"seed-0@{SEED_DOMAIN}",
+            help="The user whose ledger is charted.",
+        )
+        parser.add_argument("--days", type=int, default=365, help="Length of the chart.")
+        parser.add_argument("--repeat", type=int, default=20, help="Runs per period.")
+
+    def handle(self, *args, **options):
+        user = AuthAcc.objects.filter(email=options["email"]).first()
+        if not user:
+            raise CommandError(f"No user {options['email']}, run seed_ledger first")
+        date_to = DailyRollup.objects.for_user(user).aggregate(last=Max("date"))["last"]
+        if date_to is None:
+            raise CommandError(f"{user.email} has no transactions")
+        date_from = date_to - datetime.timedelta(days=options["days"] - 1)
+
+        for period in PERIODS:
+            timings = []
+            for _ in range(options["repeat"]):
+                started = time.perf_counter()
+                analytics = build_analytics(user, period, date_from, date_to)
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f"{period}: {len(analytics['series'])} points, "
+                f"median {statistics.median(timings):.1f} ms, max {max(timings):.1f} ms"
+            )
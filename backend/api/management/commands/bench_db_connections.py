@@ -0,0 +1,71 @@
+import copy
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.db.utils import load_backend
+
+from usermanagement.models import AuthAcc
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure the database cost per request when connections are opened for every "
+        "request, kept between requests (with and without health checks) and taken "
+        "from a psycopg pool (Postgres only). Each simulated request connects, runs "
+        "one small query and ends like Django ends a request. Run it against the "
+        "compose Postgres service for realistic connection setup costs."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500, help="Requests per mode.")
+
+    def wrapper(self, alias, **changes):
+        settings_dict = copy.deepcopy(connections.settings["default"])
+        settings_dict.update(changes)
+        backend = load_backend(settings_dict["ENGINE"])
+        return backend.DatabaseWrapper(settings_dict, alias)
+
+    def modes(self):
+        without_pool = copy.deepcopy(connections.settings["default"]["OPTIONS"])
+        without_pool.pop("pool", None)
+        yield "connection per request", self.wrapper(
+            "bench-per-request", CONN_MAX_AGE=0, CONN_HEALTH_CHECKS=False, OPTIONS=without_pool
+        )
+        yield "persistent", self.wrapper(
+            "bench-persistent", CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=False, OPTIONS=without_pool
+        )
+        yield "persistent, health checks", self.wrapper(
+            "bench-health-checks", CONN_MAX_AGE=600, CONN_HEALTH_CHECKS=True, OPTIONS=without_pool
+        )
+        if connections.settings["default"]["ENGINE"] == "django.db.backends.postgresql":
+            with_pool = {**without_pool, "pool": {"min_size": 1, "max_size": 2}}
+            yield "psycopg pool", self.wrapper("bench-pool", CONN_MAX_AGE=0, OPTIONS=with_pool)
+
+    def run(self, connection, count):
+        query = str(AuthAcc.objects.filter(pk=0).only("pk").query)
+        timings = []
+        for _ in range(count):
+            started = time.perf_counter()
+            # What a request does: connect on first use, query, then close or keep
+            connection.ensure_connection()
+            with connection.cursor() as cursor:
+                cursor.execute(query)
+                cursor.fetchall()
+            connection.close_if_unusable_or_obsolete()
+            timings.append((time.perf_counter() - started) * 1000)
+        connection.close()
+        if getattr(connection, "pool", None):
+            connection.close_pool()
+        return timings
+
+    def handle(self, *args, **options):
+        vendor = connections["default"].vendor
+        self.stdout.write(f"Database: {vendor}, {options['requests']} requests per mode")
+        for label, connection in self.modes():
+            timings = self.run(connection, options["requests"])
+            self.stdout.write(
+                f"{label}: mean {statistics.mean(timings):.3f} ms, "
+                f"p50 {statistics.median(timings):.3f} ms, max {max(timings):.3f} ms"
+            )
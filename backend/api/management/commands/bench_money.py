@@ -0,0 +1,63 @@
+import decimal
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Sum
+
+from usermanagement.models import AuthAcc
+
+from api.models import Income
+from api.money import ExactSum
+from api.reports import build_report
+
+from .seed_ledger import SEED_DOMAIN
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ways of totalling a user's income for speed and exactness: summing "
+        "floats in Python (the old report path), a plain SQL SUM, ExactSum over whole "
+        "cents, and the rollup-backed report. Seed a large ledger first, e.g. "
+        "`seed_ledger --users 1 --rows 1000000`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="email",
+            default=f"seed-0@{SEED_DOMAIN}",
+            help="The user whose ledger is totalled.",
+        )
+
+    def timed(self, label, exact, compute):
+        started = time.perf_counter()
+        total = compute()
+        elapsed = (time.perf_counter() - started) * 1000
+        if exact is None or total == exact:
+            drift = "exact"
+        else:
+            drift = f"off by {decimal.Decimal(str(total)) - exact}"
+        self.stdout.write(f"{label}: {total} in {elapsed:.1f} ms ({drift})")
+        return total
+
+    def handle(self, *args, **options):
+        user = AuthAcc.objects.filter(email=options["email"]).first()
+        if not user:
+            raise CommandError(f"No user {options['email']}, run seed_ledger first")
+        ledger = Income.objects.for_user(user)
+        amounts = ledger.values_list("amount", flat=True)
+        self.stdout.write(f"{ledger.count()} income rows")
+
+        exact = self.timed(
+            "Decimal sum in Python (reference)",
+            None,
+            lambda: sum(amounts.iterator(chunk_size=10_000)),
+        )
+        self.timed(
+            "float sum in Python",
+            exact,
+            lambda: sum(float(amount) for amount in amounts.iterator(chunk_size=10_000)),
+        )
+        self.timed("SQL SUM", exact, lambda: ledger.aggregate(total=Sum("amount"))["total"])
+        self.timed("ExactSum", exact, lambda: ledger.aggregate(total=ExactSum("amount"))["total"])
+        self.timed("report from rollups", exact, lambda: build_report(user)["total_income"])
@@ -0,0 +1,71 @@
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from usermanagement.models import AuthAcc
+
+from api.models import Expense, Income
+from api.search import search_page
+
+from .seed_ledger import SEED_DOMAIN
+
+QUERIES = ("coffee", "train ticket", "salary", "insurance subscription", "nothing-matches")
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the first page of /api/search/ for a few queries against the old way of "
+        "searching: listing every transaction and filtering the descriptions on the "
+        "client. Seed a large ledger first, e.g. `seed_ledger --users 1 --rows 500000`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="email",
+            default=f"seed-0@{SEED_DOMAIN}",
+            help="The user whose ledger is searched.",
+        )
+        parser.add_argument(
+            "--query", dest="queries", action="append", help="Query to time; repeat for several."
+        )
+        parser.add_argument("--repeat", type=int, default=10, help="Runs per query.")
+
+    def timed(self, compute, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            result = compute()
+            timings.append((time.perf_counter() - started) * 1000)
+        return result, statistics.median(timings), max(timings)
+
+    def client_side(self, user, text):
+        words = text.lower().split()
+        matches = []
+        for model in (Income, Expense):
+            rows = model.objects.for_user(user).values_list("id", "description")
+            for pk, description in rows.iterator(chunk_size=10_000):
+                if description and all(word in description.lower() for word in words):
+                    matches.append(pk)
+        return matches
+
+    def handle(self, *args, **options):
+        user = AuthAcc.objects.filter(email=options["email"]).first()
+        if not user:
+            raise CommandError(f"No user {options['email']}, run seed_ledger first")
+        self.stdout.write(f"Database: {connection.vendor}")
+
+        for text in options["queries"] or QUERIES:
+            page, median, worst = self.timed(
+                lambda: search_page(user, {"q": text}), options["repeat"]
+            )
+            self.stdout.write(
+                f"{text!r}: search {len(page['results'])} results, "
+                f"median {median:.1f} ms, max {worst:.1f} ms"
+            )
+            matches, median, worst = self.timed(lambda: self.client_side(user, text), 1)
+            self.stdout.write(
+                f"{text!r}: list and filter {len(matches)} matches in {median:.0f} ms"
+            )
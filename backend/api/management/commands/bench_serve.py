@@ -0,0 +1,148 @@
+import http.client
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from usermanagement.middleware import ClaimsRefreshToken
+from usermanagement.models import AuthAcc
+
+from .seed_ledger import SEED_DOMAIN
+
+HOST = "127.0.0.1"
+
+SERVERS = {
+    # The old container CMD
+    "runserver": ([sys.executable, "manage.py", "runserver", "--noreload"], {}),
+    "gunicorn": ([sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"], {}),
+    "uvicorn": (
+        [sys.executable, "-m", "gunicorn", "--config", "gunicorn.conf.py"],
+        {"GUNICORN_WORKER_CLASS": "uvicorn_worker.UvicornWorker"},
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Start each server on a local port, load it with concurrent keep-alive "
+        "clients for a fixed time and report requests/s and latency. Compare the dev "
+        "server with the gunicorn profile; worker counts come from the GUNICORN_* "
+        "environment variables."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--server",
+            dest="servers",
+            action="append",
+            choices=sorted(SERVERS),
+            help="Server to measure; repeat for several. Defaults to all.",
+        )
+        parser.add_argument("--path", default="/api/report/", help="Path to request.")
+        parser.add_argument(
+            "--user",
+            dest="email",
+            default=f"seed-0@{SEED_DOMAIN}",
+            help="Send the requests with this user's access token.",
+        )
+        parser.add_argument("--concurrency", type=int, default=16)
+        parser.add_argument("--duration", type=float, default=10.0, help="Seconds per server.")
+        parser.add_argument("--port", type=int, default=8765)
+
+    def wait_until_listening(self, port, process):
+        deadline = time.monotonic() + 30
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                raise CommandError(f"Server exited with status {process.returncode}")
+            try:
+                socket.create_connection((HOST, port), timeout=1).close()
+                return
+            except OSError:
+                time.sleep(0.2)
+        raise CommandError("Server did not start within 30 seconds")
+
+    def load(self, port, path, headers, concurrency, duration):
+        latencies: list[float] = []
+        errors = 0
+        lock = threading.Lock()
+        stop = time.monotonic() + duration
+
+        def client():
+            nonlocal errors
+            connection = http.client.HTTPConnection(HOST, port, timeout=30)
+            own: list[float] = []
+            failed = 0
+            while time.monotonic() < stop:
+                started = time.perf_counter()
+                try:
+                    connection.request("GET", path, headers=headers)
+                    response = connection.getresponse()
+                    response.read()
+                    if response.status >= 500:
+                        failed += 1
+                    if response.will_close:
+                        connection.close()
+                except (OSError, http.client.HTTPException):
+                    failed += 1
+                    connection.close()
+                    continue
+                own.append((time.perf_counter() - started) * 1000)
+            connection.close()
+            with lock:
+                latencies.extend(own)
+                errors += failed
+
+        threads = [threading.Thread(target=client) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return latencies, errors
+
+    def handle(self, *args, **options):
+        headers = {"Connection": "keep-alive"}
+        user = AuthAcc.objects.filter(email=options["email"]).first()
+        if user:
+            headers["Cookie"] = f"access_token={ClaimsRefreshToken.for_user(user).access_token}"
+        else:
+            self.stderr.write(f"No user {options['email']}, sending anonymous requests")
+
+        port = options["port"]
+        for name in options["servers"] or SERVERS:
+            command, env = SERVERS[name]
+            bind = f"{HOST}:{port}"
+            if name == "runserver":
+                command = [*command, bind]
+            env = {**os.environ, **env, "GUNICORN_BIND": bind, "GUNICORN_ACCESS_LOG": ""}
+            process = subprocess.Popen(
+                command,
+                cwd=settings.BASE_DIR,
+                env=env,
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            try:
+                self.wait_until_listening(port, process)
+                latencies, errors = self.load(
+                    port, options["path"], headers, options["concurrency"], options["duration"]
+                )
+            finally:
+                process.terminate()
+                process.wait()
+
+            if not latencies:
+                self.stdout.write(f"{name}: no successful requests ({errors} errors)")
+                continue
+            latencies.sort()
+            p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+            self.stdout.write(
+                f"{name}: {len(latencies) / options['duration']:.0f} requests/s, "
+                f"p50 {statistics.median(latencies):.1f} ms, p99 {p99:.1f} ms, "
+                f"{errors} errors"
+            )
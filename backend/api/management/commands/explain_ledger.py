@@ -0,0 +1,110 @@
+import datetime
+import re
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from usermanagement.models import AuthAcc
+
+from api.models import Expense, Income
+from api.pagination import encode_cursor, ledger_queryset
+from api.reports import TOTALS, _report_queries
+
+from .seed_ledger import SEED_DOMAIN
+
+LEDGER_TABLES = r"api_(?:income|expense|dailyrollup|monthlyrollup)"
+
+# Plan fragments that mean a ledger table is read in full
+FULL_SCANS = {
+    "postgresql": re.compile(rf"Seq Scan on ({LEDGER_TABLES})\b"),
+    "sqlite": re.compile(rf"\bSCAN ({LEDGER_TABLES})\b(?! USING)"),
+}
+
+# Report parameters (period, details, from, to) covering the monthly and daily rollups
+REPORTS = {
+    "report": (None, False, None, None),
+    "report by month": ("month", False, datetime.date(2024, 1, 1), datetime.date(2024, 12, 31)),
+    "report by day with details": (
+        "day", True, datetime.date(2024, 1, 15), datetime.date(2024, 3, 10)
+    ),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Print the query plans of the ledger list and report queries and fail if any "
+        "of them scans a whole ledger table. Run it against a seeded database "
+        "(see seed_ledger); on small tables the planner may prefer full scans."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            dest="email",
+            default=f"seed-0@{SEED_DOMAIN}",
+            help="The user whose ledger is queried.",
+        )
+
+    def queries(self, user):
+        limit = settings.LEDGER_PAGE_SIZE
+        for model in (Income, Expense):
+            name = model.__name__.lower()
+            ledger = model.objects.for_user(user)
+            last = ledger.order_by("-date", "-id").values("date", "id")[limit : limit + 1].first()
+            category = ledger.values_list("category__name", flat=True).first()
+
+            lists = {f"{name} list": ledger_queryset(ledger, {}, limit)}
+            if last:
+                cursor = encode_cursor(last["date"], last["id"])
+                lists[f"{name} list page 2"] = ledger_queryset(ledger, {"cursor": cursor}, limit)
+            if category:
+                lists[f"{name} list by category"] = ledger_queryset(
+                    ledger, {"category": category}, limit
+                )
+            lists[f"{name} list by date"] = ledger_queryset(
+                ledger, {"from": "2024-01-01", "to": "2024-03-31"}, limit
+            )
+            for label, queryset in lists.items():
+                yield label, queryset, None
+
+        # The querysets the report runs, as the list queries above come from ledger_queryset
+        for label, params in REPORTS.items():
+            totals, rows = _report_queries(user, *params)
+            for kind, queryset in totals.items():
+                yield f"{label}: {kind} totals", queryset, TOTALS
+            for name, queryset in rows.items():
+                yield f"{label}: {name}", queryset, None
+
+    def explain(self, queryset, aggregates):
+        if aggregates is None:
+            return queryset.explain()
+        # QuerySet.explain has no form for aggregate(), so explain the query it runs
+        with CaptureQueriesContext(connection) as captured:
+            queryset.aggregate(**aggregates)
+        with connection.cursor() as cursor:
+            cursor.execute(f"{connection.ops.explain_query_prefix()} {captured[-1]['sql']}")
+            return "\n".join(str(row[-1]) for row in cursor.fetchall())
+
+    def handle(self, *args, **options):
+        user = AuthAcc.objects.filter(email=options["email"]).first()
+        if not user:
+            raise CommandError(f"Unknown user: {options['email']}")
+
+        full_scan = FULL_SCANS.get(connection.vendor)
+        if not full_scan:
+            self.stderr.write(f"Plans are not checked on {connection.vendor}")
+
+        failures = []
+        for label, queryset, aggregates in self.queries(user):
+            plan = self.explain(queryset, aggregates)
+            self.stdout.write(self.style.MIGRATE_HEADING(label))
+            self.stdout.write(plan)
+            match = full_scan.search(plan) if full_scan else None
+            if match:
+                failures.append(f"{label}: full scan of {match.group(1)}")
+
+        if failures:
+            raise CommandError("\n".join(failures))
+        self.stdout.write(self.style.SUCCESS("All ledger queries use indexes"))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from usermanagement.models import AuthAcc
+
+from api import rollups
+
+
+class Command(BaseCommand):
+    help = "Rebuild the daily and monthly ledger rollups from the Income and Expense tables."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--user",
+            action="append",
+            dest="emails",
+            metavar="EMAIL",
+            help="Only rebuild the rollups of this user. Can be repeated.",
+        )
+
+    def handle(self, *args, **options):
+        users = None
+        if options["emails"]:
+            users = list(AuthAcc.objects.filter(email__in=options["emails"]))
+            missing = set(options["emails"]) - {user.email for user in users}
+            if missing:
+                raise CommandError(f"Unknown user(s): {', '.join(sorted(missing))}")
+        written = rollups.rebuild(users)
+        self.stdout.write(self.style.SUCCESS(f"Wrote {written} rollup rows"))
@@ -0,0 +1,103 @@
+import datetime
+import random
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from usermanagement.models import AuthAcc
+
+from api import rollups
+from api.models import Category, Expense, Income
+
+SEED_DOMAIN = "seed.fincore.local"
+
+CATEGORIES = {
+    Income: ("Seed Salary", "Seed Freelance", "Seed Interest"),
+    Expense: ("Seed Rent", "Seed Groceries", "Seed Transport", "Seed Leisure"),
+}
+
+# Words the seeded descriptions are drawn from, so text search has something to find
+DESCRIPTION_WORDS = {
+    Income: (
+        "salary bonus invoice consulting dividend refund interest rental royalty grant "
+        "tutoring resale"
+    ).split(),
+    Expense: (
+        "coffee groceries train taxi rent electricity internet cinema restaurant pharmacy "
+        "bookstore gym bakery fuel parking insurance subscription hardware clothing flowers"
+    ).split(),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed synthetic users with large income/expense ledgers for benchmarks "
+        "and query plan checks. Seed users are named seed-N@" + SEED_DOMAIN + "."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=1, help="Number of seed users.")
+        parser.add_argument(
+            "--rows", type=int, default=100_000, help="Transactions per user and kind."
+        )
+        parser.add_argument("--days", type=int, default=3650, help="Spread of dates in days.")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--seed", type=int, default=0, help="Random seed.")
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        batch_size = options["batch_size"]
+        today = datetime.date.today()
+
+        parents = {
+            model: Category.objects.get(name=model.__name__, root=True) for model in CATEGORIES
+        }
+
+        users = []
+        for index in range(options["users"]):
+            email = f"seed-{index}@{SEED_DOMAIN}"
+            user = AuthAcc.objects.filter(email=email).first()
+            if not user:
+                user = AuthAcc(email=email, username=f"seed{index}", verified=True)
+                user.set_unusable_password()
+                user.save()
+            users.append(user)
+
+        for user in users:
+            # Each user gets their own categories, as users of the API create them
+            categories = {
+                model: [
+                    Category.objects.get_or_create(
+                        user=user, name=name, defaults={"parent": parents[model]}
+                    )[0]
+                    for name in names
+                ]
+                for model, names in CATEGORIES.items()
+            }
+            for model, choices in categories.items():
+                with transaction.atomic():
+                    batch = []
+                    for _ in range(options["rows"]):
+                        batch.append(
+                            model(
+                                user=user,
+                                category=rng.choice(choices),
+                                amount=Decimal(rng.randint(100, 500_000)).scaleb(-2),
+                                date=today - datetime.timedelta(days=rng.randrange(options["days"])),
+                                description=" ".join(
+                                    rng.sample(DESCRIPTION_WORDS[model], 3)
+                                ),
+                            )
+                        )
+                        if len(batch) >= batch_size:
+                            model.objects.bulk_create(batch)
+                            batch = []
+                    model.objects.bulk_create(batch)
+            self.stdout.write(f"Seeded {user.email}")
+
+        rollups.rebuild(users)
+        if connection.vendor in ("postgresql", "sqlite"):
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+        self.stdout.write(self.style.SUCCESS(f"Seeded {len(users)} user(s)"))
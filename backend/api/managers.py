@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+
+from django.db.models import Q, QuerySet
+
+if TYPE_CHECKING:
+    from usermanagement.models import AuthAcc
+
+
+class LedgerQuerySet(QuerySet):
+    """Rows that always belong to exactly one user."""
+
+    def for_user(self, user: AuthAcc) -> QuerySet:
+        """Only the rows of ``user``."""
+        return self.filter(user_id=user.pk)
+
+
+class CategoryQuerySet(QuerySet):
+    """Categories are either owned by a user or shared (the default roots)."""
+
+    def for_user(self, user: AuthAcc) -> QuerySet:
+        """The categories ``user`` can see and use: their own and the shared ones."""
+        return self.filter(Q(user_id=user.pk) | Q(user__isnull=True))
+
+    def owned_by(self, user: AuthAcc) -> QuerySet:
+        """The categories ``user`` created and may change."""
+        return self.filter(user_id=user.pk)
@@ -0,0 +1,79 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:18
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+
+
+def build_rollups(apps, schema_editor):
+    for ledger_name, kind in (('Income', 'income'), ('Expense', 'expense')):
+        ledger = apps.get_model('api', ledger_name).objects.all()
+        daily = ledger.values('user_id', 'category_id', 'date').annotate(
+            total=Sum('amount'), count=Count('id')
+        ).order_by()
+        monthly = ledger.annotate(month=TruncMonth('date')).values(
+            'user_id', 'category_id', 'month'
+        ).annotate(total=Sum('amount'), count=Count('id')).order_by()
+        for model_name, rows, date_key in (
+            ('DailyRollup', daily, 'date'),
+            ('MonthlyRollup', monthly, 'month'),
+        ):
+            model = apps.get_model('api', model_name)
+            model.objects.bulk_create(
+                (
+                    model(
+                        user_id=row['user_id'],
+                        category_id=row['category_id'],
+                        kind=kind,
+                        date=row[date_key],
+                        total=row['total'],
+                        count=row['count'],
+                    )
+                    for row in rows.iterator()
+                ),
+                batch_size=1000,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_add_default_categories'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=7)),
+                ('date', models.DateField()),
+                ('total', models.FloatField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'kind', 'category', 'date'), name='unique_daily_rollup')],
+            },
+        ),
+        migrations.CreateModel(
+            name='MonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('income', 'Income'), ('expense', 'Expense')], max_length=7)),
+                ('date', models.DateField()),
+                ('total', models.FloatField(default=0)),
+                ('count', models.IntegerField(default=0)),
+                ('category', models.ForeignKey(null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='api.category')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'kind', 'category', 'date'), name='unique_monthly_rollup')],
+            },
+        ),
+        migrations.RunPython(build_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,76 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:36
+
+import decimal
+
+from django.db import migrations, models
+from django.db.models import BigIntegerField, Count, F, Sum
+from django.db.models.functions import Cast, Round, TruncMonth
+
+
+def cents_sum(field):
+    # Summed as whole cents, which is exact on SQLite too, where decimals are floats
+    return Sum(Cast(Round(F(field) * 100), BigIntegerField()), output_field=BigIntegerField())
+
+
+def rebuild_rollups(apps, schema_editor):
+    # Totals summed from float amounts may differ from sums of the rounded amounts
+    for model_name in ('DailyRollup', 'MonthlyRollup'):
+        apps.get_model('api', model_name).objects.all().delete()
+    for ledger_name, kind in (('Income', 'income'), ('Expense', 'expense')):
+        ledger = apps.get_model('api', ledger_name).objects.all()
+        daily = ledger.values('user_id', 'category_id', 'date').annotate(
+            cents=cents_sum('amount'), count=Count('id')
+        ).order_by()
+        monthly = ledger.annotate(month=TruncMonth('date')).values(
+            'user_id', 'category_id', 'month'
+        ).annotate(cents=cents_sum('amount'), count=Count('id')).order_by()
+        for model_name, rows, date_key in (
+            ('DailyRollup', daily, 'date'),
+            ('MonthlyRollup', monthly, 'month'),
+        ):
+            model = apps.get_model('api', model_name)
+            model.objects.bulk_create(
+                (
+                    model(
+                        user_id=row['user_id'],
+                        category_id=row['category_id'],
+                        kind=kind,
+                        date=row[date_key],
+                        total=decimal.Decimal(int(row['cents'])).scaleb(-2),
+                        count=row['count'],
+                    )
+                    for row in rows.iterator()
+                ),
+                batch_size=1000,
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_ledger_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='dailyrollup',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=18),
+        ),
+        migrations.AlterField(
+            model_name='expense',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='income',
+            name='amount',
+            field=models.DecimalField(decimal_places=2, max_digits=12),
+        ),
+        migrations.AlterField(
+            model_name='monthlyrollup',
+            name='total',
+            field=models.DecimalField(decimal_places=2, default=0, max_digits=18),
+        ),
+        migrations.RunPython(rebuild_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+# Postgres keeps a generated tsvector of each description, indexed with GIN, for
+# api.search. Other databases search with LIKE and get nothing here. The
+# configuration must match api.search.SEARCH_CONFIG.
+LEDGER_MODELS = ('Income', 'Expense')
+
+
+def add_search_columns(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    quote = schema_editor.quote_name
+    for model_name in LEDGER_MODELS:
+        table = apps.get_model('api', model_name)._meta.db_table
+        schema_editor.execute(
+            f"ALTER TABLE {quote(table)} ADD COLUMN search tsvector GENERATED ALWAYS AS "
+            f"(to_tsvector('english'::regconfig, COALESCE(description, ''))) STORED"
+        )
+        schema_editor.execute(
+            f"CREATE INDEX {quote(model_name.lower() + '_search_idx')} "
+            f"ON {quote(table)} USING gin (search)"
+        )
+
+
+def drop_search_columns(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for model_name in LEDGER_MODELS:
+        table = apps.get_model('api', model_name)._meta.db_table
+        schema_editor.execute(f"ALTER TABLE {schema_editor.quote_name(table)} DROP COLUMN search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_budgets'),
+    ]
+
+    operations = [
+        migrations.RunPython(add_search_columns, drop_search_columns),
+    ]
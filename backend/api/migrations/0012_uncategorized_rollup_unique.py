@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 05:04
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def merge_uncategorized(apps, schema_editor):
+    """Merge the uncategorized rollup rows that deleted categories left behind."""
+    for name in ("DailyRollup", "MonthlyRollup"):
+        model = apps.get_model("api", name)
+        uncategorized = model.objects.filter(category=None)
+        duplicates = (
+            uncategorized.values("user_id", "kind", "date")
+            .annotate(rows=Count("id"))
+            .filter(rows__gt=1)
+            .order_by()
+        )
+        for key in list(duplicates):
+            del key["rows"]
+            rows = list(uncategorized.filter(**key))
+            # Totals are summed as decimals in Python, so they stay exact
+            model.objects.filter(pk__in=[row.pk for row in rows]).delete()
+            model.objects.create(
+                **key,
+                total=sum(row.total for row in rows),
+                count=sum(row.count for row in rows),
+            )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_category_name_per_user'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RunPython(merge_uncategorized, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='dailyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('category', None)), fields=('user', 'kind', 'date'), name='unique_daily_uncategorized_rollup'),
+        ),
+        migrations.AddConstraint(
+            model_name='monthlyrollup',
+            constraint=models.UniqueConstraint(condition=models.Q(('category', None)), fields=('user', 'kind', 'date'), name='unique_monthly_uncategorized_rollup'),
+        ),
+    ]
@@ -4,10 +4,17 @@ from django.db.models import *
 
 from usermanagement.models import AuthAcc
 
+from .managers import CategoryQuerySet, LedgerQuerySet
+
 # Create your models here.
 
+# Amounts are exact decimals with cents as the smallest unit
+AMOUNT_DIGITS = 12
+AMOUNT_PLACES = 2
+TOTAL_DIGITS = 18  # Room for sums of many amounts
+
 class Category(Model):
-    name = CharField(max_length=100, unique=True)
+    name = CharField(max_length=100)
     description = TextField(blank=True, null=True)
 
     parent = ForeignKey(
@@ -17,31 +24,172 @@ class Category(Model):
     user = ForeignKey(AuthAcc, on_delete=CASCADE, related_name="categories", null=True, blank=True)
     
     root = BooleanField(default=False) # If True, This Category Can not be used Directly in Income or Expense
+
+    objects = CategoryQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            # Names are unique per user; shared categories have no user, so get their own
+            UniqueConstraint(fields=["user", "name"], name="unique_category_user_name"),
+            UniqueConstraint(
+                fields=["name"], condition=Q(user=None), name="unique_shared_category_name"
+            ),
+        ]
     
     def __str__(self) -> str:
         return self.name
     
         
 class Income(Model):
-    amount = FloatField()
+    amount = DecimalField(max_digits=AMOUNT_DIGITS, decimal_places=AMOUNT_PLACES)
     description = TextField(blank=True, null=True)
     date = DateField()
     category = ForeignKey(Category, on_delete=SET_NULL, null=True, related_name="incomes")
 
     user = ForeignKey(AuthAcc, on_delete=CASCADE, related_name="incomes")
 
+    objects = LedgerQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            Index(fields=["user", "date", "id"], name="income_user_date_idx"),
+            Index(fields=["user", "category", "date"], name="income_user_category_date_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"+{self.amount} on {self.date}"
 
         
 class Expense(Model):
-    amount = FloatField()
+    amount = DecimalField(max_digits=AMOUNT_DIGITS, decimal_places=AMOUNT_PLACES)
     description = TextField(blank=True, null=True)
     date = DateField()
     category = ForeignKey(Category, on_delete=SET_NULL, null=True, related_name="expenses")
 
     user = ForeignKey(AuthAcc, on_delete=CASCADE, related_name="expenses")
 
+    objects = LedgerQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            Index(fields=["user", "date", "id"], name="expense_user_date_idx"),
+            Index(fields=["user", "category", "date"], name="expense_user_category_date_idx"),
+        ]
+
     def __str__(self) -> str:
         return f"-{self.amount} on {self.date}"
 
+
+
+class Rollup(Model):
+    """Precomputed per-user, per-category totals for one period of the ledger."""
+
+    INCOME = "income"
+    EXPENSE = "expense"
+    KIND_CHOICES = [(INCOME, "Income"), (EXPENSE, "Expense")]
+
+    user = ForeignKey(AuthAcc, on_delete=CASCADE, related_name="+")
+    category = ForeignKey(Category, on_delete=SET_NULL, null=True, related_name="+")
+    kind = CharField(max_length=7, choices=KIND_CHOICES)
+    date = DateField() # Start of the period
+    total = DecimalField(max_digits=TOTAL_DIGITS, decimal_places=AMOUNT_PLACES, default=0)
+    count = IntegerField(default=0)
+
+    objects = LedgerQuerySet.as_manager()
+
+    class Meta:
+        abstract = True
+
+
+class DailyRollup(Rollup):
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user", "kind", "category", "date"], name="unique_daily_rollup"
+            ),
+            # NULLs are distinct in the constraint above, so uncategorized rows need their own
+            UniqueConstraint(
+                fields=["user", "kind", "date"],
+                condition=Q(category=None),
+                name="unique_daily_uncategorized_rollup",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.total} on {self.date}"
+
+
+class MonthlyRollup(Rollup):
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user", "kind", "category", "date"], name="unique_monthly_rollup"
+            ),
+            # NULLs are distinct in the constraint above, so uncategorized rows need their own
+            UniqueConstraint(
+                fields=["user", "kind", "date"],
+                condition=Q(category=None),
+                name="unique_monthly_uncategorized_rollup",
+            ),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.total} in {self.date:%Y-%m}"
+
+
+class RecurringTransaction(Model):
+    """An income or expense repeated on the dates of an RFC 5545 recurrence rule."""
+
+    user = ForeignKey(AuthAcc, on_delete=CASCADE, related_name="recurring_transactions")
+    kind = CharField(max_length=7, choices=Rollup.KIND_CHOICES)
+    amount = DecimalField(max_digits=AMOUNT_DIGITS, decimal_places=AMOUNT_PLACES)
+    description = TextField(blank=True, null=True)
+    category = ForeignKey(Category, on_delete=SET_NULL, null=True, related_name="+")
+
+    rule = CharField(max_length=255) # e.g. "FREQ=MONTHLY;BYMONTHDAY=1"
+    start = DateField()
+    next_run = DateField(null=True) # Next occurrence not yet written, None once finished
+
+    objects = LedgerQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            Index(fields=["next_run", "id"], name="recurring_next_run_idx"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.kind} {self.amount} {self.rule}"
+
+
+class Budget(Model):
+    """A monthly spending limit on a category, counting its whole subtree."""
+
+    user = ForeignKey(AuthAcc, on_delete=CASCADE, related_name="budgets")
+    category = ForeignKey(Category, on_delete=CASCADE, related_name="+")
+    amount = DecimalField(max_digits=AMOUNT_DIGITS, decimal_places=AMOUNT_PLACES)
+
+    objects = LedgerQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["user", "category"], name="unique_budget")
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.amount} a month on {self.category_id}"
+
+
+class BudgetSpend(Model):
+    """Running total of the expenses counted against a budget in one month."""
+
+    budget = ForeignKey(Budget, on_delete=CASCADE, related_name="spends")
+    month = DateField() # First day of the month
+    spent = DecimalField(max_digits=TOTAL_DIGITS, decimal_places=AMOUNT_PLACES, default=0)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["budget", "month"], name="unique_budget_spend")
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.spent} in {self.month:%Y-%m}"
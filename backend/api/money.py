@@ -0,0 +1,69 @@
+from __future__ import annotations
+
+import decimal
+from typing import Any, Optional
+
+from django.db.models import BigIntegerField, F, Sum
+from django.db.models.functions import Cast, Round
+
+from .models import AMOUNT_DIGITS, AMOUNT_PLACES
+
+MINOR_UNITS = 10**AMOUNT_PLACES  # Cents per unit
+MINOR_UNIT = decimal.Decimal(1).scaleb(-AMOUNT_PLACES)
+
+
+def parse_amount(value: Any) -> decimal.Decimal:
+    """Parse a transaction amount into an exact decimal.
+
+    Numbers are read through their text form, so ``12.3`` is exactly ``12.30``.
+
+    Raises:
+        ValueError: If the value is not a finite number with at most ``AMOUNT_PLACES``
+            decimal places that fits ``AMOUNT_DIGITS`` digits.
+    """
+    try:
+        amount = decimal.Decimal(str(value).strip())
+    except decimal.InvalidOperation:
+        raise ValueError("Invalid amount")
+    if not amount.is_finite():
+        raise ValueError("Invalid amount")
+    # Checked before quantizing, which fails on amounts beyond the context precision
+    if amount and amount.adjusted() >= AMOUNT_DIGITS - AMOUNT_PLACES:
+        raise ValueError("Invalid amount, too large")
+    exact = amount.quantize(MINOR_UNIT)
+    if exact != amount:
+        raise ValueError(f"Invalid amount, expected at most {AMOUNT_PLACES} decimal places")
+    return exact
+
+
+def from_cents(cents: int) -> decimal.Decimal:
+    """The exact amount of a whole number of cents."""
+    return decimal.Decimal(cents).scaleb(-AMOUNT_PLACES)
+
+
+class CentsSum(Sum):
+    """``SUM`` of a money column in whole cents, as an integer."""
+
+    def __init__(self, field: str, **extra: Any) -> None:
+        cents = Cast(Round(F(field) * MINOR_UNITS), BigIntegerField())
+        super().__init__(cents, output_field=BigIntegerField(), **extra)
+
+    def convert_value(self, value: Any, expression: Any, connection: Any) -> Optional[int]:
+        # Postgres returns SUM(bigint) as numeric
+        return None if value is None else int(value)
+
+
+class ExactSum(CentsSum):
+    """``SUM`` of a money column, computed over whole cents.
+
+    Postgres sums ``numeric`` exactly, but SQLite stores decimals as floats and its
+    ``SUM`` drifts on large ledgers. Summing integer cents is exact on both; the
+    result is converted back to a ``Decimal``.
+    """
+
+    def convert_value(
+        self, value: Optional[int], expression: Any, connection: Any
+    ) -> Optional[decimal.Decimal]:
+        if value is None:
+            return None
+        return from_cents(int(value))
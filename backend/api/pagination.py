@@ -0,0 +1,112 @@
+from __future__ import annotations
+
+import base64
+import binascii
+import datetime
+from typing import Any, Mapping, Optional
+
+from django.conf import settings
+from django.db.models import Q, QuerySet
+
+from .reports import parse_date_param
+
+LIST_FIELDS = ("id", "amount", "date", "category__name", "description")
+
+
+def encode_cursor(date: datetime.date, pk: int) -> str:
+    """Encode the ``(date, id)`` position of the last row of a page."""
+    raw = f"{date.isoformat()}|{pk}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime.date, int]:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date, pk = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.date.fromisoformat(date), int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+
+
+def page_size(value: Optional[str]) -> int:
+    """Resolve the ``limit`` query parameter against the configured page sizes.
+
+    Raises:
+        ValueError: If the value is not a positive integer.
+    """
+    if not value:
+        return settings.LEDGER_PAGE_SIZE
+    try:
+        size = int(value)
+    except ValueError:
+        raise ValueError("Invalid limit")
+    if size < 1:
+        raise ValueError("Invalid limit")
+    return min(size, settings.LEDGER_MAX_PAGE_SIZE)
+
+
+def ledger_queryset(queryset: QuerySet, params: Mapping[str, str], limit: int) -> QuerySet:
+    """Apply the listing filters and the keyset window to ``queryset``.
+
+    One row beyond ``limit`` is fetched to tell whether another page follows.
+
+    Raises:
+        ValueError: If any of the parameters is invalid.
+    """
+    date_from = parse_date_param(params.get("from"), "from")
+    date_to = parse_date_param(params.get("to"), "to")
+
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+    if params.get("category"):
+        queryset = queryset.filter(category__name=params["category"])
+    if params.get("cursor"):
+        date, pk = decode_cursor(params["cursor"])
+        queryset = queryset.filter(Q(date__lt=date) | Q(date=date, id__lt=pk))
+
+    return queryset.order_by("-date", "-id").values(*LIST_FIELDS)[: limit + 1]
+
+
+def ledger_page(queryset: QuerySet, params: Mapping[str, str]) -> dict[str, Any]:
+    """Return one page of income or expense rows, newest first.
+
+    Pages are keyed on ``(date, id)`` rather than on an offset, so fetching any page
+    is a bounded index range scan regardless of how deep into the ledger it is.
+
+    Supported query parameters are ``from``/``to`` (inclusive ``YYYY-MM-DD`` bounds),
+    ``category`` (category name), ``limit`` and ``cursor`` (the ``next`` value of the
+    previous page).
+
+    Raises:
+        ValueError: If any of the parameters is invalid.
+
+    Returns:
+        dict[str, Any]: ``results`` and the ``next`` cursor, or None on the last page.
+    """
+    limit = page_size(params.get("limit"))
+    return _page(list(ledger_queryset(queryset, params, limit)), limit)
+
+
+async def aledger_page(queryset: QuerySet, params: Mapping[str, str]) -> dict[str, Any]:
+    """Async version of ``ledger_page``, for views served over ASGI.
+
+    Raises:
+        ValueError: If any of the parameters is invalid.
+    """
+    limit = page_size(params.get("limit"))
+    return _page([row async for row in ledger_queryset(queryset, params, limit)], limit)
+
+
+def _page(rows: list[dict[str, Any]], limit: int) -> dict[str, Any]:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["date"], rows[-1]["id"])
+    return {"results": rows, "next": next_cursor}
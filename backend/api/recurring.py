@@ -0,0 +1,151 @@
+from __future__ import annotations
+
+import datetime
+import re
+from itertools import islice
+from typing import Optional
+
+from dateutil.rrule import rrule, rrulestr
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import transaction
+from django.utils import timezone
+
+from usermanagement.models import AuthAcc
+
+from . import cache, rollups
+from .models import Expense, Income, RecurringTransaction, Rollup
+
+MODELS = {Rollup.INCOME: Income, Rollup.EXPENSE: Expense}
+
+# Transactions are dated, so rules repeating within a day are rejected
+SUB_DAILY = re.compile(r"FREQ=(HOURLY|MINUTELY|SECONDLY)|BY(HOUR|MINUTE|SECOND)=", re.IGNORECASE)
+# dateutil accepts INTERVAL=0, which repeats the first date forever
+INTERVAL = re.compile(r"(?:^|[:;])INTERVAL=([^;]*)", re.IGNORECASE)
+
+MAX_RULE_LENGTH = RecurringTransaction._meta.get_field("rule").max_length
+
+
+def _midnight(date: datetime.date) -> datetime.datetime:
+    return datetime.datetime.combine(date, datetime.time())
+
+
+def parse_rule(rule: str, start: datetime.date) -> rrule:
+    """Parse an RFC 5545 ``RRULE`` such as ``FREQ=MONTHLY;BYMONTHDAY=1`` from ``start``.
+
+    Raises:
+        ValueError: If the rule is malformed, longer than ``MAX_RULE_LENGTH``, has an
+            ``INTERVAL`` below 1 or repeats more often than daily, including within a
+            day through ``BYHOUR``, ``BYMINUTE`` or ``BYSECOND``.
+    """
+    if not isinstance(rule, str) or SUB_DAILY.search(rule) or "DTSTART" in rule.upper():
+        raise ValueError("Invalid rule, expected a daily or coarser RRULE")
+    if len(rule) > MAX_RULE_LENGTH:
+        raise ValueError(f"Rule too long, at most {MAX_RULE_LENGTH} characters")
+    interval = INTERVAL.search(rule)
+    if interval and not (interval.group(1).isdigit() and int(interval.group(1)) >= 1):
+        raise ValueError("Invalid rule, INTERVAL must be at least 1")
+    try:
+        return rrulestr(rule.strip().removeprefix("RRULE:"), dtstart=_midnight(start))
+    except (ValueError, TypeError):
+        raise ValueError("Invalid rule, expected a daily or coarser RRULE")
+
+
+def first_run(rule: str, start: datetime.date) -> Optional[datetime.date]:
+    """The first occurrence of ``rule`` on or after ``start``, None if there is none.
+
+    Raises:
+        ValueError: If the rule is invalid.
+    """
+    occurrence = parse_rule(rule, start).after(_midnight(start), inc=True)
+    return occurrence.date() if occurrence else None
+
+
+def due_dates(
+    recurring: RecurringTransaction, today: datetime.date, limit: int
+) -> tuple[list[datetime.date], Optional[datetime.date]]:
+    """Occurrences of ``recurring`` from its ``next_run`` up to ``today``, at most ``limit``.
+
+    Returns:
+        tuple[list[date], Optional[date]]: The due dates, and the occurrence after them
+            to store as the new ``next_run``.
+    """
+    occurrences = parse_rule(recurring.rule, recurring.start).xafter(
+        _midnight(recurring.next_run), inc=True
+    )
+    dates: list[datetime.date] = []
+    following: Optional[datetime.date] = None
+    for occurrence in islice(occurrences, limit + 1):
+        if occurrence.date() > today or len(dates) == limit:
+            following = occurrence.date()
+            break
+        dates.append(occurrence.date())
+    return dates, following
+
+
+def materialize_due(today: Optional[datetime.date] = None) -> int:
+    """Write the transactions of every rule due by ``today``.
+
+    Due rules are found through the ``next_run`` index and handled
+    ``RECURRING_BATCH_SIZE`` at a time: each batch locks its rules, creates their
+    transactions with ``bulk_create``, adds them to the rollups and advances
+    ``next_run`` past them in one transaction, so a crashed or concurrent run never
+    writes an occurrence twice. A rule writes at most ``RECURRING_MAX_CATCH_UP``
+    occurrences per batch; the rest follow in later batches of the same run. A rule
+    whose ``next_run`` would not advance writes its distinct dates once and stops, and
+    one that no longer parses stops without writing.
+
+    Returns:
+        int: The number of transactions created.
+
+    Raises:
+        ImproperlyConfigured: If the batch size or catch-up limit is not positive.
+    """
+    today = today or timezone.localdate()
+    batch_size = settings.RECURRING_BATCH_SIZE
+    catch_up = settings.RECURRING_MAX_CATCH_UP
+    if batch_size < 1 or catch_up < 1:
+        # A rule that writes nothing never advances, and would be picked up forever
+        raise ImproperlyConfigured(
+            "RECURRING_BATCH_SIZE and RECURRING_MAX_CATCH_UP must be at least 1"
+        )
+    due = (
+        RecurringTransaction.objects.filter(next_run__lte=today)
+        .order_by("next_run", "id")
+        .select_for_update(skip_locked=True)
+    )
+    created = 0
+    while True:
+        with transaction.atomic():
+            batch = list(due[:batch_size])
+            if not batch:
+                break
+            entries: dict[str, list[Income | Expense]] = {kind: [] for kind in MODELS}
+            for recurring in batch:
+                previous = recurring.next_run
+                try:
+                    dates, recurring.next_run = due_dates(recurring, today, catch_up)
+                except ValueError:
+                    # Stored before parse_rule rejected it; it would fail on every run
+                    dates, recurring.next_run = [], None
+                if recurring.next_run is not None and recurring.next_run <= previous:
+                    # A rule that does not move forward would be picked up forever
+                    dates, recurring.next_run = sorted(set(dates)), None
+                entries[recurring.kind].extend(
+                    MODELS[recurring.kind](
+                        amount=recurring.amount,
+                        date=date,
+                        category_id=recurring.category_id,
+                        description=recurring.description,
+                        user_id=recurring.user_id,
+                    )
+                    for date in dates
+                )
+            for kind, rows in entries.items():
+                MODELS[kind].objects.bulk_create(rows, batch_size=batch_size)
+                rollups.apply(MODELS[kind], rows)
+                created += len(rows)
+            RecurringTransaction.objects.bulk_update(batch, ["next_run"], batch_size=batch_size)
+        for user_id in {recurring.user_id for recurring in batch}:
+            cache.invalidate(AuthAcc(pk=user_id))
+    return created
@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import calendar
+import datetime
+from typing import Any, Optional
+
+from django.db.models import QuerySet, Sum
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek, TruncYear
+from django.utils.dateparse import parse_date
+
+from usermanagement.models import AuthAcc
+
+from .models import DailyRollup, Expense, Income, MonthlyRollup, Rollup
+from .money import ExactSum
+
+PERIODS = {
+    "day": TruncDay,
+    "week": TruncWeek,
+    "month": TruncMonth,
+    "year": TruncYear,
+}
+
+# Periods that can be answered from monthly rollups
+COARSE_PERIODS = ("month", "year")
+
+RECENT_LIMIT = 5
+
+DETAIL_FIELDS = ("id", "amount", "date", "category__name", "description")
+
+TOTALS = {"total": ExactSum("total"), "count": Sum("count")}
+
+TRUE_VALUES = ("1", "true", "yes", "on")
+
+
+def is_true(value: Optional[str]) -> bool:
+    """Interpret a query string flag such as ``?details=true``."""
+    return bool(value) and value.lower() in TRUE_VALUES
+
+
+def parse_date_param(value: Optional[str], name: str) -> Optional[datetime.date]:
+    """Parse an ISO ``YYYY-MM-DD`` query parameter.
+
+    Raises:
+        ValueError: If the value is present but is not a valid date.
+    """
+    if not value:
+        return None
+    try:
+        parsed = parse_date(value)
+    except ValueError:
+        parsed = None
+    if parsed is None:
+        raise ValueError(f"Invalid '{name}' date, expected YYYY-MM-DD")
+    return parsed
+
+
+def _month_aligned(
+    date_from: Optional[datetime.date], date_to: Optional[datetime.date]
+) -> bool:
+    """Whether the range covers whole months, so monthly rollups can answer it."""
+    if date_from and date_from.day != 1:
+        return False
+    if date_to and date_to.day != calendar.monthrange(date_to.year, date_to.month)[1]:
+        return False
+    return True
+
+
+def _within(
+    queryset: QuerySet,
+    date_from: Optional[datetime.date],
+    date_to: Optional[datetime.date],
+) -> QuerySet:
+    if date_from:
+        queryset = queryset.filter(date__gte=date_from)
+    if date_to:
+        queryset = queryset.filter(date__lte=date_to)
+    return queryset
+
+
+def _rollups(
+    model: type[Rollup],
+    kind: str,
+    user: AuthAcc,
+    date_from: Optional[datetime.date],
+    date_to: Optional[datetime.date],
+) -> QuerySet:
+    return _within(model.objects.for_user(user).filter(kind=kind), date_from, date_to)
+
+
+def _by_category(queryset: QuerySet) -> QuerySet:
+    return (
+        queryset.values("category_id", "category__name")
+        .annotate(total=ExactSum("total"), count=Sum("count"))
+        .order_by("-total")
+    )
+
+
+def _by_period(queryset: QuerySet, period: str) -> QuerySet:
+    trunc = PERIODS[period]
+    return (
+        queryset.annotate(period=trunc("date"))
+        .values("period")
+        .annotate(total=ExactSum("total"))
+        .order_by("period")
+    )
+
+
+def _merge_periods(
+    income: dict[datetime.date, Any], expense: dict[datetime.date, Any]
+) -> list[dict[str, Any]]:
+    series = []
+    for period in sorted(set(income) | set(expense)):
+        income_total = income.get(period, 0)
+        expense_total = expense.get(period, 0)
+        series.append(
+            {
+                "period": period,
+                "income": income_total,
+                "expense": expense_total,
+                "balance": income_total - expense_total,
+            }
+        )
+    return series
+
+
+def _report_queries(
+    user: AuthAcc,
+    period: Optional[str],
+    details: bool,
+    date_from: Optional[datetime.date],
+    date_to: Optional[datetime.date],
+) -> tuple[dict[str, QuerySet], dict[str, QuerySet]]:
+    """The querysets behind a report: rollups to total per kind, and row lists.
+
+    Raises:
+        ValueError: If ``period`` is not supported.
+    """
+    if period and period not in PERIODS:
+        raise ValueError(f"Invalid period, expected one of {', '.join(PERIODS)}")
+
+    summary = MonthlyRollup if _month_aligned(date_from, date_to) else DailyRollup
+    income_rollups = _rollups(summary, Rollup.INCOME, user, date_from, date_to)
+    expense_rollups = _rollups(summary, Rollup.EXPENSE, user, date_from, date_to)
+
+    newest_first = ("-date", "-id")
+    income = _within(Income.objects.for_user(user), date_from, date_to).order_by(*newest_first)
+    expense = _within(Expense.objects.for_user(user), date_from, date_to).order_by(*newest_first)
+
+    totals = {Rollup.INCOME: income_rollups, Rollup.EXPENSE: expense_rollups}
+    rows = {
+        "income_by_category": _by_category(income_rollups),
+        "expense_by_category": _by_category(expense_rollups),
+        "recent_income": income.values(*DETAIL_FIELDS)[:RECENT_LIMIT],
+        "recent_expense": expense.values(*DETAIL_FIELDS)[:RECENT_LIMIT],
+    }
+    if period:
+        series = summary if period in COARSE_PERIODS else DailyRollup
+        rows["income_series"] = _by_period(
+            _rollups(series, Rollup.INCOME, user, date_from, date_to), period
+        )
+        rows["expense_series"] = _by_period(
+            _rollups(series, Rollup.EXPENSE, user, date_from, date_to), period
+        )
+    if details:
+        rows["income_details"] = income.values(*DETAIL_FIELDS)
+        rows["expense_details"] = expense.values(*DETAIL_FIELDS)
+    return totals, rows
+
+
+def _assemble(
+    period: Optional[str],
+    totals: dict[str, dict[str, Any]],
+    rows: dict[str, list[dict[str, Any]]],
+) -> dict[str, Any]:
+    income_total = totals[Rollup.INCOME]["total"] or 0
+    expense_total = totals[Rollup.EXPENSE]["total"] or 0
+    report: dict[str, Any] = {
+        "total_income": income_total,
+        "total_expense": expense_total,
+        "total_balance": income_total - expense_total,
+        "income_count": totals[Rollup.INCOME]["count"] or 0,
+        "expense_count": totals[Rollup.EXPENSE]["count"] or 0,
+    }
+    series = {
+        kind: {row["period"]: row["total"] for row in rows.pop(f"{kind}_series", ())}
+        for kind in (Rollup.INCOME, Rollup.EXPENSE)
+    }
+    report.update(rows)
+    if period:
+        report["period"] = period
+        report["series"] = _merge_periods(series[Rollup.INCOME], series[Rollup.EXPENSE])
+    return report
+
+
+def build_report(
+    user: AuthAcc,
+    period: Optional[str] = None,
+    details: bool = False,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> dict[str, Any]:
+    """Build the ledger report for ``user`` using database-side aggregation.
+
+    Totals, per-category and per-period sums are read from the daily and monthly
+    rollups with ``SUM``/``GROUP BY``, so the cost of a report depends on the number
+    of categories and periods rather than on the number of transactions. Monthly
+    rollups are used whenever the date range covers whole months. Full transaction
+    lists are only included when ``details`` is set.
+
+    Args:
+        user (AuthAcc): The owner of the ledger.
+        period (str, optional): One of ``PERIODS`` to include a period series.
+        details (bool, optional): Include every transaction. Defaults to False.
+        date_from (date, optional): Inclusive lower bound on the transaction date.
+        date_to (date, optional): Inclusive upper bound on the transaction date.
+
+    Raises:
+        ValueError: If ``period`` is not supported.
+
+    Returns:
+        dict[str, Any]: The report payload.
+    """
+    totals, rows = _report_queries(user, period, details, date_from, date_to)
+    return _assemble(
+        period,
+        {kind: queryset.aggregate(**TOTALS) for kind, queryset in totals.items()},
+        {name: list(queryset) for name, queryset in rows.items()},
+    )
+
+
+async def abuild_report(
+    user: AuthAcc,
+    period: Optional[str] = None,
+    details: bool = False,
+    date_from: Optional[datetime.date] = None,
+    date_to: Optional[datetime.date] = None,
+) -> dict[str, Any]:
+    """Async version of ``build_report``, for views served over ASGI.
+
+    Raises:
+        ValueError: If ``period`` is not supported.
+    """
+    totals, rows = _report_queries(user, period, details, date_from, date_to)
+    return _assemble(
+        period,
+        {kind: await queryset.aaggregate(**TOTALS) for kind, queryset in totals.items()},
+        {name: [row async for row in queryset] for name, queryset in rows.items()},
+    )
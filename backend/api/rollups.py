@@ -0,0 +1,181 @@
+from __future__ import annotations
+
+import datetime
+import decimal
+from collections import defaultdict
+from typing import Iterable, Optional
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Sum
+from django.db.models.functions import TruncMonth
+
+from usermanagement.models import AuthAcc
+
+from . import budgets
+from .models import DailyRollup, Expense, Income, MonthlyRollup, Rollup
+from .money import ExactSum
+
+KINDS: dict[type[Income] | type[Expense], str] = {
+    Income: Rollup.INCOME,
+    Expense: Rollup.EXPENSE,
+}
+
+BATCH_SIZE = 1000
+
+
+def month_start(date: datetime.date) -> datetime.date:
+    return date.replace(day=1)
+
+
+def _bump(
+    model: type[Rollup],
+    user_id: int,
+    kind: str,
+    category_id: Optional[int],
+    date: datetime.date,
+    total: decimal.Decimal,
+    count: int,
+) -> None:
+    lookup = {"user_id": user_id, "kind": kind, "category_id": category_id, "date": date}
+    updated = model.objects.filter(**lookup).update(
+        total=F("total") + total, count=F("count") + count
+    )
+    if updated:
+        return
+    try:
+        with transaction.atomic():
+            model.objects.create(**lookup, total=total, count=count)
+    except IntegrityError:
+        # Another request created the row first
+        model.objects.filter(**lookup).update(
+            total=F("total") + total, count=F("count") + count
+        )
+
+
+def apply(
+    model: type[Income] | type[Expense],
+    rows: Iterable[Income | Expense],
+    sign: int = 1,
+) -> None:
+    """Add (``sign=1``) or remove (``sign=-1``) transactions from the rollups.
+
+    Rows are grouped per day and month first, so a batch touches each rollup row once.
+    Expenses also move the counters of the budgets they fall under.
+    """
+    kind = KINDS[model]
+    daily: dict[tuple, list] = defaultdict(lambda: [0, 0])
+    for row in rows:
+        key = (row.user_id, row.category_id, row.date)
+        daily[key][0] += row.amount
+        daily[key][1] += 1
+
+    monthly: dict[tuple, list] = defaultdict(lambda: [0, 0])
+    for (user_id, category_id, date), (total, count) in daily.items():
+        key = (user_id, category_id, month_start(date))
+        monthly[key][0] += total
+        monthly[key][1] += count
+
+    with transaction.atomic():
+        for target, groups in ((DailyRollup, daily), (MonthlyRollup, monthly)):
+            for (user_id, category_id, date), (total, count) in groups.items():
+                _bump(target, user_id, kind, category_id, date, sign * total, sign * count)
+        if kind == Rollup.EXPENSE:
+            budgets.apply({key: total for key, (total, count) in monthly.items()}, sign)
+        if sign < 0:
+            for target in (DailyRollup, MonthlyRollup):
+                target.objects.filter(kind=kind, count__lte=0).filter(
+                    user_id__in={key[0] for key in daily}
+                ).delete()
+
+
+def record(instance: Income | Expense) -> None:
+    """Add a newly written transaction to the rollups."""
+    apply(type(instance), [instance])
+
+
+def discard(instance: Income | Expense) -> None:
+    """Remove a deleted transaction from the rollups."""
+    apply(type(instance), [instance], sign=-1)
+
+
+def collapse_uncategorized(user_id: int, category_ids: Iterable[int]) -> None:
+    """Move the rollup rows of categories about to be deleted onto the uncategorized ones.
+
+    Deleting a category sets ``category`` to NULL on its transactions, whose totals then
+    belong to the single uncategorized row of the user for each kind and period. Call
+    it in the transaction that deletes the categories, before the delete.
+
+    Args:
+        user_id (int): The owner of the categories.
+        category_ids (Iterable[int]): The categories being deleted, with their descendants.
+    """
+    category_ids = list(category_ids)
+    for target in (DailyRollup, MonthlyRollup):
+        rows = target.objects.filter(user_id=user_id, category_id__in=category_ids)
+        merged = list(
+            rows.values_list("kind", "date")
+            .annotate(merged_total=ExactSum("total"), merged_count=Sum("count"))
+            .order_by()
+        )
+        rows.delete()
+        for kind, date, total, count in merged:
+            _bump(target, user_id, kind, None, date, total, count)
+
+
+def rebuild(users: Optional[Iterable[AuthAcc]] = None) -> int:
+    """Recompute the rollups from the ledger.
+
+    Args:
+        users (Iterable[AuthAcc], optional): Limit the rebuild to these users.
+            Defaults to every user.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    written = 0
+    with transaction.atomic():
+        for target in (DailyRollup, MonthlyRollup):
+            existing = target.objects.all()
+            if users is not None:
+                existing = existing.filter(user__in=users)
+            existing.delete()
+
+        for model, kind in KINDS.items():
+            ledger = model.objects.all()
+            if users is not None:
+                ledger = ledger.filter(user__in=users)
+
+            daily = (
+                ledger.values("user_id", "category_id", "date")
+                .annotate(total=ExactSum("amount"), count=Count("id"))
+                .order_by()
+            )
+            monthly = (
+                ledger.annotate(month=TruncMonth("date"))
+                .values("user_id", "category_id", "month")
+                .annotate(total=ExactSum("amount"), count=Count("id"))
+                .order_by()
+            )
+            for target, rows, date_key in (
+                (DailyRollup, daily, "date"),
+                (MonthlyRollup, monthly, "month"),
+            ):
+                batch = []
+                for row in rows.iterator(chunk_size=BATCH_SIZE):
+                    batch.append(
+                        target(
+                            user_id=row["user_id"],
+                            category_id=row["category_id"],
+                            kind=kind,
+                            date=row[date_key],
+                            total=row["total"],
+                            count=row["count"],
+                        )
+                    )
+                    if len(batch) >= BATCH_SIZE:
+                        target.objects.bulk_create(batch)
+                        written += len(batch)
+                        batch = []
+                target.objects.bulk_create(batch)
+                written += len(batch)
+    return written
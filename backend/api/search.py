@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import base64
+import binascii
+from typing import Any, Mapping
+
+from django.db import connection
+from django.db.models import Case, F, FloatField, QuerySet, Value, When
+from django.db.models.expressions import RawSQL
+
+from usermanagement.models import AuthAcc
+
+from .models import Expense, Income, Rollup
+from .pagination import LIST_FIELDS, page_size
+
+MODELS = {Rollup.INCOME: Income, Rollup.EXPENSE: Expense}
+
+# Text search configuration of the generated ``search`` columns (migration 0010)
+SEARCH_CONFIG = "english"
+SEARCH_COLUMN = "search"
+
+MAX_QUERY_LENGTH = 200
+
+
+def encode_cursor(offset: int) -> str:
+    """Encode the position of the next page of ranked results."""
+    return base64.urlsafe_b64encode(str(offset).encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor produced by ``encode_cursor``.
+
+    Raises:
+        ValueError: If the cursor is malformed.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        offset = int(base64.urlsafe_b64decode(padded).decode())
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise ValueError("Invalid cursor")
+    if offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+
+def _full_text(queryset: QuerySet, text: str) -> QuerySet:
+    """Match against the ``tsvector`` column and its GIN index, ranked by ``ts_rank``."""
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField
+
+    column = f"{connection.ops.quote_name(queryset.model._meta.db_table)}.{SEARCH_COLUMN}"
+    query = SearchQuery(text, config=SEARCH_CONFIG, search_type="websearch")
+    return (
+        queryset.alias(vector=RawSQL(column, [], output_field=SearchVectorField()))
+        .filter(vector=query)
+        .annotate(rank=SearchRank(F("vector"), query))
+    )
+
+
+def _contains(queryset: QuerySet, text: str) -> QuerySet:
+    """``LIKE`` every word, for databases without full-text search.
+
+    Descriptions holding the query as a phrase rank above those with the words apart.
+    """
+    for word in text.split():
+        queryset = queryset.filter(description__icontains=word)
+    return queryset.annotate(
+        rank=Case(
+            When(description__icontains=text, then=Value(1.0)),
+            default=Value(0.5),
+            output_field=FloatField(),
+        )
+    )
+
+
+def search_queryset(
+    user: AuthAcc, text: str, kinds: tuple[str, ...], limit: int, offset: int = 0
+) -> QuerySet:
+    """Transactions of ``user`` whose description matches ``text``, best first.
+
+    One row beyond ``limit`` is fetched to tell whether another page follows.
+    """
+    match = _full_text if connection.vendor == "postgresql" else _contains
+    ranked = [
+        match(MODELS[kind].objects.for_user(user), text)
+        .annotate(kind=Value(kind))
+        .values("kind", *LIST_FIELDS, "rank")
+        for kind in kinds
+    ]
+    queryset = ranked[0].union(*ranked[1:], all=True) if len(ranked) > 1 else ranked[0]
+    return queryset.order_by("-rank", "-date", "-id")[offset : offset + limit + 1]
+
+
+def search_page(user: AuthAcc, params: Mapping[str, str]) -> dict[str, Any]:
+    """Return one page of the transactions whose description matches ``q``.
+
+    On Postgres descriptions are matched with ``websearch_to_tsquery`` against a
+    generated ``tsvector`` column with a GIN index, which the database keeps current
+    on every write, and ranked with ``ts_rank``. Other databases fall back to a
+    ``LIKE`` per word.
+
+    Supported query parameters are ``q``, ``kind`` (``income``, ``expense`` or
+    ``all``), ``limit`` and ``cursor`` (the ``next`` value of the previous page).
+
+    Raises:
+        ValueError: If any of the parameters is invalid.
+
+    Returns:
+        dict[str, Any]: ``results`` and the ``next`` cursor, or None on the last page.
+    """
+    text = (params.get("q") or "").strip()
+    if not text:
+        raise ValueError("Search query is required")
+    if len(text) > MAX_QUERY_LENGTH:
+        raise ValueError(f"Search query too long, at most {MAX_QUERY_LENGTH} characters")
+    kind = params.get("kind") or "all"
+    if kind == "all":
+        kinds = tuple(MODELS)
+    elif kind in MODELS:
+        kinds = (kind,)
+    else:
+        raise ValueError("Invalid kind, expected income, expense or all")
+    limit = page_size(params.get("limit"))
+    offset = decode_cursor(params["cursor"]) if params.get("cursor") else 0
+
+    rows = list(search_queryset(user, text, kinds, limit, offset))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(offset + limit)
+    return {"results": rows, "next": next_cursor}
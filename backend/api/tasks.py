@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from celery import shared_task
+
+from custom import debug
+
+from .budgets import reconcile
+from .recurring import materialize_due
+
+
+@shared_task
+def materialize_recurring_transactions() -> int:
+    """Write the due occurrences of every user's recurring transactions.
+
+    Returns:
+        int: The number of transactions created.
+    """
+    created = materialize_due()
+    if created:
+        debug(f"Created {created} recurring transactions")
+    return created
+
+
+@shared_task
+def reconcile_budgets() -> int:
+    """Repair budget counters that drifted from the expense rollups.
+
+    Returns:
+        int: The number of counters repaired.
+    """
+    repaired = reconcile()
+    if repaired:
+        debug(f"Repaired {repaired} budget counters")
+    return repaired
@@ -0,0 +1,18 @@
+from rest_framework.test import APIClient
+
+from usermanagement.middleware import ClaimsRefreshToken
+from usermanagement.models import AuthAcc
+
+
+def make_user(email: str) -> AuthAcc:
+    user = AuthAcc(email=email, username=email.split("@")[0], verified=True)
+    user.set_password("pw123456")
+    user.save()
+    return user
+
+
+def client_for(user: AuthAcc) -> APIClient:
+    """A client authenticated with an access token cookie, as the browser sends it."""
+    client = APIClient()
+    client.cookies["access_token"] = str(ClaimsRefreshToken.for_user(user).access_token)
+    return client
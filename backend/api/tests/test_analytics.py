@@ -0,0 +1,25 @@
+from django.test import TestCase
+
+from .helpers import client_for, make_user
+
+
+class AnalyticsRangeTests(TestCase):
+    url = "/api/analytics/"
+
+    def setUp(self):
+        self.client = client_for(make_user("analytics@example.com"))
+
+    def test_dates_at_the_edges_of_the_calendar_are_a_bad_request(self):
+        for params in (
+            {"from": "0001-01-01", "to": "0001-01-05"},
+            {"to": "0001-02-01"},
+            {"from": "9999-12-01", "to": "9999-12-31"},
+        ):
+            with self.subTest(**params):
+                response = self.client.get(self.url, params)
+                self.assertEqual(response.status_code, 400)
+
+    def test_default_range_is_clamped(self):
+        response = self.client.get(self.url, {"to": "0001-06-01", "period": "month"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(str(response.data["from"]), "0001-03-31")
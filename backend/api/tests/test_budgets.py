@@ -0,0 +1,49 @@
+from django.test import TestCase
+
+from api.models import BudgetSpend
+
+from .helpers import client_for, make_user
+
+
+class BudgetCounterTests(TestCase):
+    def setUp(self):
+        self.client = client_for(make_user("budget@example.com"))
+        self.client.post("/api/categories/", {"name": "Food"}, format="json")
+        self.client.post("/api/categories/", {"name": "Groceries", "parent": "Food"}, format="json")
+        self.client.post("/api/budgets/", {"amount": "100", "category": "Food"}, format="json")
+
+    def post_expense(self, amount, category):
+        response = self.client.post(
+            "/api/expenses/",
+            {"amount": amount, "date": "2024-01-10", "category": category},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+        return response
+
+    def test_expenses_move_the_spend(self):
+        response = self.post_expense("12.50", "Groceries")
+        [budget] = response.data["budgets"]
+        self.assertEqual(budget["spent"], 12.5)
+        self.assertEqual(budget["remaining"], 87.5)
+
+        response = self.post_expense("7.50", "Food")
+        self.assertEqual(response.data["budgets"][0]["spent"], 20)
+        self.assertEqual(BudgetSpend.objects.get().spent, 20)
+
+    def test_deleting_an_expense_gives_the_budget_back(self):
+        expense_id = self.post_expense("30", "Groceries").data["id"]
+        self.client.delete("/api/expenses/", {"id": expense_id}, format="json")
+        self.assertEqual(BudgetSpend.objects.get().spent, 0)
+
+    def test_deleting_a_child_category_gives_its_spend_back(self):
+        self.post_expense("3", "Food")
+        expense_id = self.post_expense("30", "Groceries").data["id"]
+        categories = self.client.get("/api/categories/").data
+        [groceries] = [row["id"] for row in categories if row["name"] == "Groceries"]
+        self.client.delete("/api/categories/", {"id": groceries}, format="json")
+        self.assertEqual(BudgetSpend.objects.get().spent, 3)
+
+        # The expense is uncategorized now, so deleting it leaves the budget alone
+        self.client.delete("/api/expenses/", {"id": expense_id}, format="json")
+        self.assertEqual(BudgetSpend.objects.get().spent, 3)
@@ -0,0 +1,27 @@
+from django.core.cache import cache
+from django.test import TestCase
+
+from .helpers import client_for, make_user
+
+
+class CategoryCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = client_for(make_user("cache@example.com"))
+        self.client.post("/api/categories/", {"name": "Food"}, format="json")
+
+    def test_list_and_tree_are_cached_apart(self):
+        listing = self.client.get("/api/categories/")
+        tree = self.client.get("/api/categories/tree/")
+        self.assertNotEqual(listing.data, tree.data)
+        self.assertIn("children", tree.data[0])
+        self.assertEqual(self.client.get("/api/categories/").data, listing.data)
+
+    def test_a_new_category_invalidates_both(self):
+        self.client.get("/api/categories/")
+        self.client.get("/api/categories/tree/")
+        self.client.post("/api/categories/", {"name": "Travel"}, format="json")
+        names = [category["name"] for category in self.client.get("/api/categories/").data]
+        tree = [node["name"] for node in self.client.get("/api/categories/tree/").data]
+        self.assertIn("Travel", names)
+        self.assertIn("Travel", tree)
@@ -0,0 +1,37 @@
+from django.test import TestCase
+
+from api.models import Category
+
+from .helpers import client_for, make_user
+
+
+class CategoryNameTests(TestCase):
+    url = "/api/categories/"
+
+    def setUp(self):
+        self.alice = client_for(make_user("alice@example.com"))
+        self.bob = client_for(make_user("bob@example.com"))
+
+    def own_names(self, client):
+        response = client.get(self.url)
+        return [row["name"] for row in response.data if row["name"] == "Food"]
+
+    def test_names_are_unique_per_user(self):
+        for client in (self.alice, self.bob):
+            response = client.post(self.url, {"name": "Food"}, format="json")
+            self.assertEqual(response.status_code, 201)
+
+        self.assertEqual(Category.objects.filter(name="Food").count(), 2)
+        self.assertEqual(self.own_names(self.alice), ["Food"])
+        self.assertEqual(self.own_names(self.bob), ["Food"])
+
+    def test_duplicate_name_is_a_bad_request(self):
+        self.alice.post(self.url, {"name": "Food"}, format="json")
+        response = self.alice.post(self.url, {"name": "Food"}, format="json")
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data, {"error": "Category already exists"})
+
+    def test_shared_names_cannot_be_reused(self):
+        Category.objects.create(name="Shared")
+        response = self.alice.post(self.url, {"name": "Shared"}, format="json")
+        self.assertEqual(response.status_code, 400)
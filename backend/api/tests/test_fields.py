@@ -0,0 +1,32 @@
+from cryptography.fernet import Fernet
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+from api.fields import EncryptedTextField
+from api.models import Expense
+
+
+class EncryptedTextFieldTests(SimpleTestCase):
+    def setUp(self):
+        self.field = EncryptedTextField()
+        self.field.set_attributes_from_name("description")
+        self.field.model = Expense
+
+    def load(self, stored):
+        return self.field.from_db_value(stored, None, None)
+
+    def test_round_trip(self):
+        stored = self.field.get_prep_value("rent for march")
+        self.assertNotIn("rent", stored)
+        self.assertEqual(self.load(stored), "rent for march")
+        self.assertIsNone(self.field.get_prep_value(None))
+        self.assertIsNone(self.load(None))
+
+    def test_plaintext_stored_before_encryption_is_read_as_is(self):
+        self.assertEqual(self.load("rent for march"), "rent for march")
+        self.assertEqual(self.load(""), "")
+
+    def test_token_of_an_unknown_key_is_a_configuration_error(self):
+        stored = Fernet(Fernet.generate_key()).encrypt(b"rent").decode()
+        with self.assertRaisesMessage(ImproperlyConfigured, "Expense.description"):
+            self.load(stored)
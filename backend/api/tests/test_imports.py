@@ -0,0 +1,30 @@
+from django.test import TestCase
+
+from api.models import Expense
+
+from .helpers import client_for, make_user
+
+
+class ImportTests(TestCase):
+    url = "/api/expenses/import/"
+
+    def setUp(self):
+        self.client = client_for(make_user("import@example.com"))
+        self.client.post("/api/categories/", {"name": "Food"}, format="json")
+
+    def test_category_that_is_not_a_name_is_a_row_error(self):
+        rows = [
+            {"amount": "5", "date": "2024-01-10", "category": "Food"},
+            {"amount": "5", "date": "2024-01-10", "category": ["Food"]},
+            {"amount": "5", "date": "2024-01-10", "category": {"name": "Food"}},
+        ]
+        response = self.client.post(self.url, rows, format="json")
+        self.assertEqual(response.data["created"], 1)
+        self.assertEqual(
+            response.data["errors"],
+            [
+                {"row": 2, "error": "Category must be a name"},
+                {"row": 3, "error": "Category must be a name"},
+            ],
+        )
+        self.assertEqual(Expense.objects.count(), 1)
@@ -0,0 +1,70 @@
+import datetime
+from decimal import Decimal
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from api import cache, rollups
+from api.models import Category, Expense, Income
+
+from .helpers import client_for, make_user
+
+ENDPOINTS = (
+    "/api/incomes/",
+    "/api/expenses/",
+    "/api/report/",
+    "/api/report/?from=2024-01-01&to=2024-01-31&period=day",
+    "/api/categories/",
+    "/api/categories/tree/",
+)
+
+
+def seed(user, rows):
+    """Give ``user`` their own categories and ``rows`` transactions of each kind."""
+    categories = [
+        Category.objects.create(user=user, name=f"{user.username} {index}") for index in range(3)
+    ]
+    for model in (Income, Expense):
+        model.objects.bulk_create(
+            model(
+                user=user,
+                category=categories[index % 3],
+                amount=Decimal(index + 1),
+                date=datetime.date(2024, 1, 1) + datetime.timedelta(days=index % 60),
+                description=f"{user.username} {index}",
+            )
+            for index in range(rows)
+        )
+
+
+class TenantIsolationTests(TestCase):
+    """What a user gets, and how many queries it takes, does not depend on other users."""
+
+    def setUp(self):
+        self.user = make_user("tenant@example.com")
+        self.client = client_for(self.user)
+        seed(self.user, 20)
+        rollups.rebuild([self.user])
+
+    def fetch(self, url):
+        # Bypass the response cache, so every request runs its queries
+        cache.invalidate(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return response.data, len(queries)
+
+    def test_other_users_data_changes_neither_results_nor_query_counts(self):
+        for url in ENDPOINTS:
+            self.fetch(url)  # Warm the per-process category tree
+        before = {url: self.fetch(url) for url in ENDPOINTS}
+
+        others = [make_user(f"other{index}@example.com") for index in range(3)]
+        for other in others:
+            seed(other, 200)
+        rollups.rebuild(others)
+
+        for url in ENDPOINTS:
+            with self.subTest(url=url):
+                self.assertEqual(self.fetch(url), before[url])
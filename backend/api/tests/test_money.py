@@ -0,0 +1,31 @@
+from decimal import Decimal
+
+from django.test import SimpleTestCase, TestCase
+
+from api.money import parse_amount
+
+from .helpers import client_for, make_user
+
+
+class ParseAmountTests(SimpleTestCase):
+    def test_amounts_are_exact(self):
+        self.assertEqual(parse_amount(12.3), Decimal("12.30"))
+        self.assertEqual(parse_amount("9999999999.99"), Decimal("9999999999.99"))
+        self.assertEqual(parse_amount("0E+100"), Decimal("0.00"))
+
+    def test_invalid_amounts_raise_value_error(self):
+        for value in ("1e30", "-1e30", "10000000000", "1.234", "nan", "inf", "abc"):
+            with self.subTest(value=value), self.assertRaises(ValueError):
+                parse_amount(value)
+
+
+class OutOfRangeAmountTests(TestCase):
+    def test_out_of_range_amount_is_a_bad_request(self):
+        client = client_for(make_user("money@example.com"))
+        client.post("/api/categories/", {"name": "Food"}, format="json")
+        response = client.post(
+            "/api/expenses/",
+            {"amount": "1e30", "date": "2024-01-10", "category": "Food"},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 400)
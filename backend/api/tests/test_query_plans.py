@@ -0,0 +1,30 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from api.management.commands.seed_ledger import SEED_DOMAIN
+from api.models import Category
+
+
+class LedgerQueryPlanTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        call_command("seed_ledger", users=2, rows=2000, stdout=StringIO())
+
+    def test_ledger_queries_do_not_scan_whole_tables(self):
+        # explain_ledger raises CommandError naming any query with a full scan
+        out = StringIO()
+        call_command("explain_ledger", stdout=out, stderr=StringIO())
+        self.assertIn("All ledger queries use indexes", out.getvalue())
+        # The plans of the queries the report itself runs
+        self.assertIn("report by month: expense totals", out.getvalue())
+        self.assertIn("report by day with details: recent_expense", out.getvalue())
+
+    def test_seed_categories_belong_to_each_user(self):
+        seeded = Category.objects.filter(name__startswith="Seed ")
+        self.assertFalse(seeded.filter(user=None).exists())
+        self.assertEqual(
+            set(seeded.values_list("user__email", flat=True)),
+            {f"seed-0@{SEED_DOMAIN}", f"seed-1@{SEED_DOMAIN}"},
+        )
@@ -0,0 +1,55 @@
+import datetime
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import TestCase, override_settings
+
+from api.models import Expense, RecurringTransaction, Rollup
+from api.recurring import materialize_due, parse_rule
+
+from .helpers import make_user
+
+START = datetime.date(2024, 1, 1)
+
+
+class ParseRuleTests(TestCase):
+    def test_daily_and_coarser_rules_are_accepted(self):
+        rule = parse_rule("FREQ=MONTHLY;BYMONTHDAY=1;COUNT=3", START)
+        self.assertEqual(len(list(rule)), 3)
+
+    def test_interval_is_accepted(self):
+        rule = parse_rule("FREQ=DAILY;INTERVAL=2;COUNT=2", START)
+        self.assertEqual([day.day for day in rule], [1, 3])
+
+    def test_rules_repeating_within_a_day_are_rejected(self):
+        for rule in (
+            "FREQ=HOURLY",
+            "FREQ=DAILY;BYHOUR=1,2,3;COUNT=6",
+            "FREQ=DAILY;BYMINUTE=0,30",
+            "FREQ=WEEKLY;BYSECOND=5",
+            "FREQ=DAILY;INTERVAL=0",
+            "FREQ=DAILY;INTERVAL=-1",
+            "FREQ=MONTHLY;BYMONTHDAY=1;" + "BYMONTH=1;" * 30,
+        ):
+            with self.subTest(rule=rule), self.assertRaises(ValueError):
+                parse_rule(rule, START)
+
+
+class MaterializeDueTests(TestCase):
+    @override_settings(RECURRING_MAX_CATCH_UP=0)
+    def test_catch_up_limit_must_be_positive(self):
+        with self.assertRaises(ImproperlyConfigured):
+            materialize_due(START)
+
+    def test_stored_rule_that_no_longer_parses_stops(self):
+        # Stored before INTERVAL=0, which repeats the first date forever, was rejected
+        RecurringTransaction.objects.create(
+            user=make_user("recurring@example.com"),
+            kind=Rollup.EXPENSE,
+            amount="5",
+            rule="FREQ=DAILY;INTERVAL=0",
+            start=START,
+            next_run=START,
+        )
+        self.assertEqual(materialize_due(START), 0)
+        self.assertFalse(Expense.objects.exists())
+        self.assertIsNone(RecurringTransaction.objects.get().next_run)
@@ -0,0 +1,24 @@
+import datetime
+
+from django.test import SimpleTestCase, TestCase
+
+from api.reports import _month_aligned
+
+from .helpers import client_for, make_user
+
+
+class MonthAlignedTests(SimpleTestCase):
+    def test_ranges_of_whole_months(self):
+        self.assertTrue(_month_aligned(datetime.date(2024, 2, 1), datetime.date(2024, 2, 29)))
+        self.assertTrue(_month_aligned(None, datetime.date.max))
+        self.assertFalse(_month_aligned(datetime.date(2024, 2, 1), datetime.date(2024, 2, 28)))
+        self.assertFalse(_month_aligned(datetime.date(2024, 2, 2), None))
+
+
+class ReportRangeTests(TestCase):
+    def test_last_representable_day(self):
+        client = client_for(make_user("report@example.com"))
+        for url in ("/api/report/", "/api/async/report/"):
+            with self.subTest(url=url):
+                response = client.get(url, {"from": "9999-12-01", "to": "9999-12-31"})
+                self.assertEqual(response.status_code, 200)
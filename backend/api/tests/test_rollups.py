@@ -0,0 +1,73 @@
+from django.test import TestCase
+
+from api import category_tree
+from api.models import Category, DailyRollup, MonthlyRollup
+
+from .helpers import client_for, make_user
+
+
+class DeleteCategoryTests(TestCase):
+    def setUp(self):
+        self.user = make_user("rollups@example.com")
+        self.client = client_for(self.user)
+        self.client.post("/api/categories/", {"name": "Food"}, format="json")
+        self.client.post("/api/categories/", {"name": "Groceries", "parent": "Food"}, format="json")
+        self.client.post("/api/categories/", {"name": "Rent"}, format="json")
+
+        self.other = make_user("other@example.com")
+        other_client = client_for(self.other)
+        other_client.post("/api/categories/", {"name": "Food"}, format="json")
+        other_client.post("/api/categories/", {"name": "Other"}, format="json")
+        for category in ("Food", "Other"):
+            self.post_expense(other_client, "1", category)
+        self.delete_category(other_client, "Other")
+
+    def post_expense(self, client, amount, category):
+        response = client.post(
+            "/api/expenses/",
+            {"amount": amount, "date": "2024-01-10", "category": category},
+            format="json",
+        )
+        self.assertEqual(response.status_code, 201)
+
+    def delete_category(self, client, name):
+        categories = client.get("/api/categories/").data
+        [category_id] = [row["id"] for row in categories if row["name"] == name]
+        response = client.delete("/api/categories/", {"id": category_id}, format="json")
+        self.assertEqual(response.status_code, 200)
+
+    def test_deleted_subtree_joins_the_uncategorized_rows(self):
+        for amount, category in (("10", "Food"), ("2.50", "Groceries"), ("4", "Rent")):
+            self.post_expense(self.client, amount, category)
+        self.delete_category(self.client, "Rent")
+        self.delete_category(self.client, "Food")
+
+        for model in (DailyRollup, MonthlyRollup):
+            [row] = model.objects.filter(user=self.user)
+            self.assertIsNone(row.category_id)
+            self.assertEqual((row.total, row.count), (16.5, 3))
+
+            # The rows of the other user are left alone
+            self.assertEqual(
+                sorted(model.objects.filter(user=self.other).values_list("total", "count")),
+                [(1, 1), (1, 1)],
+            )
+
+    def test_categories_missing_from_a_cached_tree_are_collapsed(self):
+        self.post_expense(self.client, "4", "Rent")
+        self.delete_category(self.client, "Rent")
+        category_tree.get_tree(self.user)
+        # Created without invalidating the tree, as another worker's cache would miss it
+        food = Category.objects.get(user=self.user, name="Food")
+        Category.objects.create(user=self.user, name="Snacks", parent=food)
+        self.post_expense(self.client, "3", "Snacks")
+        self.delete_category(self.client, "Food")
+
+        for model in (DailyRollup, MonthlyRollup):
+            [row] = model.objects.filter(user=self.user)
+            self.assertEqual((row.category_id, row.total, row.count), (None, 7, 2))
+
+    def test_category_missing_from_a_cached_tree_can_be_deleted(self):
+        category_tree.get_tree(self.user)
+        Category.objects.create(user=self.user, name="Loose")
+        self.delete_category(self.client, "Loose")
@@ -1,12 +1,26 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from . import async_views
 from .views import *
 
 urlpatterns = [
     path("auth/", include("usermanagement.urls")),
     path("categories/", CategoryView.as_view(), name="categories"),
+    path("categories/tree/", CategoryTreeView.as_view(), name="categories_tree"),
     path("report/", get_report, name="report"),
+    path("analytics/", get_analytics, name="analytics"),
+    path("search/", search_ledger, name="search"),
+    path("cache/stats/", get_cache_stats, name="cache_stats"),
     path('incomes/', IncomeView.as_view(), name='incomes'),
+    path('incomes/import/', ImportView.as_view(model=Income), name='incomes_import'),
     path('expenses/', ExpenseView.as_view(), name='expenses'),
+    path('expenses/import/', ImportView.as_view(model=Expense), name='expenses_import'),
+    path('budgets/', BudgetView.as_view(), name='budgets'),
+    path('recurring/', RecurringView.as_view(), name='recurring'),
+    path('export/<str:fmt>/', ExportView.as_view(), name='export'),
+    # Async variants, for serving over ASGI
+    path('async/report/', async_views.get_report, name='async_report'),
+    path('async/incomes/', async_views.LedgerView.as_view(model=Income), name='async_incomes'),
+    path('async/expenses/', async_views.LedgerView.as_view(model=Expense), name='async_expenses'),
 ]
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views.decorators.csrf import csrf_exempt
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
@@ -8,31 +12,74 @@ from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from .models import Category, Income, Expense
+from custom import IsStaff
+
+from . import budgets, cache, category_tree, rollups
+from .analytics import build_analytics, parse_category_param
+from .cache import cached_response
+from .exports import CONTENT_TYPES, MODELS, STREAMS, export_rows
+from .imports import import_rows, read_rows
+from .models import Budget, Category, Income, Expense, RecurringTransaction
+from .money import parse_amount
+from .pagination import ledger_page
+from .recurring import first_run
+from .reports import build_report, is_true, parse_date_param
+from .search import search_page
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@cached_response('report')
 def get_report(request: Request) -> Response:
-    # Placeholder for report generation logic
-    income = Income.objects.all().values('amount', 'date', 'category__name')
-    expense = Expense.objects.all().values('amount', 'date', 'category__name')
-    total_income = sum(item['amount'] for item in income)
-    total_expense = sum(item['amount'] for item in expense)
-    total_balance = total_income - total_expense
-    report = {
-        'total_income': total_income,
-        'total_expense': total_expense,
-        'total_balance': total_balance,
-        'income_details': list(income),
-        'expense_details': list(expense),
-    }
+    params = request.query_params
+    try:
+        report = build_report(
+            request.user,
+            period=params.get('period'),
+            details=is_true(params.get('details')),
+            date_from=parse_date_param(params.get('from'), 'from'),
+            date_to=parse_date_param(params.get('to'), 'to'),
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
     return Response(report)
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@cached_response('analytics')
+def get_analytics(request: Request) -> Response:
+    params = request.query_params
+    try:
+        analytics = build_analytics(
+            request.user,
+            period=params.get('period'),
+            date_from=parse_date_param(params.get('from'), 'from'),
+            date_to=parse_date_param(params.get('to'), 'to'),
+            categories=parse_category_param(params.get('category'), request.user),
+        )
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    return Response(analytics)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def search_ledger(request: Request) -> Response:
+    try:
+        page = search_page(request.user, request.query_params)
+    except ValueError as e:
+        return Response({'error': str(e)}, status=400)
+    return Response(page)
+
+@api_view(['GET'])
+@permission_classes([IsStaff])
+def get_cache_stats(request: Request) -> Response:
+    return Response(cache.stats())
+
 class CategoryView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(cached_response('categories'))
     def get(self, request: Request) -> Response:
-        categories = Category.objects.all().values('id', 'name', 'description', 'parent', 'parent__name', 'root')
+        categories = Category.objects.for_user(request.user).values('id', 'name', 'description', 'parent', 'parent__name', 'root')
         return Response(list(categories))
 
     def post(self, request: Request) -> Response:
@@ -47,18 +94,28 @@ class CategoryView(APIView):
 
         if parent_name:
             try:
-                parent = Category.objects.get(name=parent_name)
+                parent = Category.objects.for_user(user).get(name=parent_name)
             except Category.DoesNotExist:
                 return Response({'error': 'Parent category does not exist'}, status=400)
         else:
             parent = None
 
-        category = Category.objects.create(
-            name=name,
-            parent=parent,
-            description=description,
-            user=user
-        )
+        # Checked against the shared categories too, so names stay unambiguous for lookups
+        if Category.objects.for_user(user).filter(name=name).exists():
+            return Response({'error': 'Category already exists'}, status=400)
+        try:
+            with transaction.atomic():
+                category = Category.objects.create(
+                    name=name,
+                    parent=parent,
+                    description=description,
+                    user_id=user.pk
+                )
+        except IntegrityError:
+            # Another request created it first
+            return Response({'error': 'Category already exists'}, status=400)
+        category_tree.invalidate(category)
+        cache.invalidate(request.user)
         return Response({'id': category.id, 'name': category.name}, status=201)
 
     def delete(self, request: Request) -> Response:
@@ -67,18 +124,38 @@ class CategoryView(APIView):
             return Response({'error': 'Category ID is required'}, status=400)
         
         try:
-            category = Category.objects.get(id=category_id)
-            category.delete()
+            category = Category.objects.owned_by(request.user).get(id=category_id)
+            with transaction.atomic():
+                # Children are deleted with their parent
+                subtree = category_tree.load_subtree(category)
+                rollups.collapse_uncategorized(request.user.pk, subtree)
+                category.delete()
+                category_tree.invalidate(category)
+                # Ancestors' budgets no longer count the expenses that became uncategorized
+                budgets.reconcile(Budget.objects.for_user(request.user))
+            cache.invalidate(request.user)
             return Response({'status': 'Category deleted'}, status=200)
         except Category.DoesNotExist:
             return Response({'error': 'Category does not exist'}, status=404)
 
+class CategoryTreeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @method_decorator(cached_response('category_tree'))
+    def get(self, request: Request) -> Response:
+        tree = category_tree.get_tree(request.user)
+        totals = category_tree.subtree_totals(request.user)
+        return Response(tree.as_nested(income=totals['income'], expense=totals['expense']))
+
 class IncomeView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request: Request) -> Response:
-        incomes = Income.objects.all().values('id', 'amount', 'date', 'category__name', 'description')
-        return Response(list(incomes))
+        try:
+            page = ledger_page(Income.objects.for_user(request.user), request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(page)
 
     def post(self, request: Request) -> Response:
         data = request.data
@@ -92,17 +169,26 @@ class IncomeView(APIView):
             return Response({'error': 'Amount, date, and category are required'}, status=400)
 
         try:
-            category = Category.objects.get(name=category_name)
+            amount = parse_amount(amount)
+            date = parse_date_param(date, 'date')
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid amount or date'}, status=400)
+
+        try:
+            category = Category.objects.for_user(user).get(name=category_name)
         except Category.DoesNotExist:
             return Response({'error': 'Category does not exist'}, status=400)
 
-        income = Income.objects.create(
-            amount=amount,
-            date=date,
-            category=category,
-            description=description,
-            user=user
-        )
+        with transaction.atomic():
+            income = Income.objects.create(
+                amount=amount,
+                date=date,
+                category=category,
+                description=description,
+                user_id=user.pk
+            )
+            rollups.record(income)
+        cache.invalidate(user)
         return Response({'id': income.id, 'amount': income.amount}, status=201)
 
     def delete(self, request: Request) -> Response:
@@ -111,8 +197,11 @@ class IncomeView(APIView):
             return Response({'error': 'Income ID is required'}, status=400)
         
         try:
-            income = Income.objects.get(id=income_id)
-            income.delete()
+            income = Income.objects.for_user(request.user).get(id=income_id)
+            with transaction.atomic():
+                income.delete()
+                rollups.discard(income)
+            cache.invalidate(request.user)
             return Response({'status': 'Income deleted'}, status=200)
         except Income.DoesNotExist:
             return Response({'error': 'Income does not exist'}, status=404)
@@ -121,8 +210,11 @@ class ExpenseView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request: Request) -> Response:
-        expenses = Expense.objects.all().values('id', 'amount', 'date', 'category__name', 'description')
-        return Response(list(expenses))
+        try:
+            page = ledger_page(Expense.objects.for_user(request.user), request.query_params)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(page)
 
     def post(self, request: Request) -> Response:
         data = request.data
@@ -136,18 +228,31 @@ class ExpenseView(APIView):
             return Response({'error': 'Amount, date, and category are required'}, status=400)
 
         try:
-            category = Category.objects.get(name=category_name)
+            amount = parse_amount(amount)
+            date = parse_date_param(date, 'date')
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid amount or date'}, status=400)
+
+        try:
+            category = Category.objects.for_user(user).get(name=category_name)
         except Category.DoesNotExist:
             return Response({'error': 'Category does not exist'}, status=400)
 
-        expense = Expense.objects.create(
-            amount=amount,
-            date=date,
-            category=category,
-            description=description,
-            user=user
-        )
-        return Response({'id': expense.id, 'amount': expense.amount}, status=201)
+        with transaction.atomic():
+            expense = Expense.objects.create(
+                amount=amount,
+                date=date,
+                category=category,
+                description=description,
+                user_id=user.pk
+            )
+            rollups.record(expense)
+        cache.invalidate(user)
+        return Response({
+            'id': expense.id,
+            'amount': expense.amount,
+            'budgets': budgets.remaining(user, category.id, date),
+        }, status=201)
 
     def delete(self, request: Request) -> Response:
         expense_id = request.data.get('id')
@@ -155,9 +260,168 @@ class ExpenseView(APIView):
             return Response({'error': 'Expense ID is required'}, status=400)
         
         try:
-            expense = Expense.objects.get(id=expense_id)
-            expense.delete()
+            expense = Expense.objects.for_user(request.user).get(id=expense_id)
+            with transaction.atomic():
+                expense.delete()
+                rollups.discard(expense)
+            cache.invalidate(request.user)
             return Response({'status': 'Expense deleted'}, status=200)
         except Expense.DoesNotExist:
             return Response({'error': 'Expense does not exist'}, status=404)
-        
\ No newline at end of file
+
+
+class BudgetView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request) -> Response:
+        try:
+            month = parse_date_param(request.query_params.get('month'), 'month')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        return Response(budgets.status(request.user, month or timezone.localdate()))
+
+    def post(self, request: Request) -> Response:
+        data = request.data
+        amount = data.get('amount')
+        category_name = data.get('category')
+        user = request.user
+
+        if not all([amount, category_name]):
+            return Response({'error': 'Amount and category are required'}, status=400)
+
+        try:
+            amount = parse_amount(amount)
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid amount'}, status=400)
+        if amount <= 0:
+            return Response({'error': 'Amount must be positive'}, status=400)
+
+        try:
+            category = Category.objects.for_user(user).get(name=category_name)
+        except Category.DoesNotExist:
+            return Response({'error': 'Category does not exist'}, status=400)
+
+        with transaction.atomic():
+            budget, created = Budget.objects.update_or_create(
+                user_id=user.pk, category=category, defaults={'amount': amount}
+            )
+            if created:
+                # Count the expenses already in the ledger
+                budgets.reconcile(Budget.objects.filter(pk=budget.pk))
+        return Response({'id': budget.id, 'amount': budget.amount}, status=201 if created else 200)
+
+    def delete(self, request: Request) -> Response:
+        budget_id = request.data.get('id')
+        if not budget_id:
+            return Response({'error': 'Budget ID is required'}, status=400)
+
+        deleted, _ = Budget.objects.for_user(request.user).filter(id=budget_id).delete()
+        if not deleted:
+            return Response({'error': 'Budget does not exist'}, status=404)
+        return Response({'status': 'Budget deleted'}, status=200)
+
+
+class RecurringView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request) -> Response:
+        rules = RecurringTransaction.objects.for_user(request.user).order_by('id').values(
+            'id', 'kind', 'amount', 'description', 'category__name', 'rule', 'start', 'next_run'
+        )
+        return Response(list(rules))
+
+    def post(self, request: Request) -> Response:
+        data = request.data
+        kind = data.get('kind')
+        amount = data.get('amount')
+        start = data.get('start')
+        category_name = data.get('category')
+        rule = data.get('rule')
+        description = data.get('description', '')
+        user = request.user
+
+        if not all([kind, amount, start, category_name, rule]):
+            return Response({'error': 'Kind, amount, start, category, and rule are required'}, status=400)
+        if kind not in MODELS:
+            return Response({'error': 'Invalid kind, expected income or expense'}, status=400)
+
+        try:
+            amount = parse_amount(amount)
+            start = parse_date_param(start, 'start')
+        except (TypeError, ValueError):
+            return Response({'error': 'Invalid amount or start'}, status=400)
+
+        try:
+            next_run = first_run(rule, start)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        try:
+            category = Category.objects.for_user(user).get(name=category_name)
+        except Category.DoesNotExist:
+            return Response({'error': 'Category does not exist'}, status=400)
+
+        # Due occurrences are written by the materialize_recurring_transactions task
+        recurring = RecurringTransaction.objects.create(
+            kind=kind,
+            amount=amount,
+            category=category,
+            description=description,
+            rule=rule,
+            start=start,
+            next_run=next_run,
+            user_id=user.pk
+        )
+        return Response({'id': recurring.id, 'next_run': recurring.next_run}, status=201)
+
+    def delete(self, request: Request) -> Response:
+        recurring_id = request.data.get('id')
+        if not recurring_id:
+            return Response({'error': 'Recurring transaction ID is required'}, status=400)
+
+        deleted, _ = RecurringTransaction.objects.for_user(request.user).filter(id=recurring_id).delete()
+        if not deleted:
+            return Response({'error': 'Recurring transaction does not exist'}, status=404)
+        return Response({'status': 'Recurring transaction deleted'}, status=200)
+
+
+class ImportView(APIView):
+    permission_classes = [IsAuthenticated]
+    model: type[Income] | type[Expense] = Income
+
+    def post(self, request: Request) -> Response:
+        try:
+            rows = read_rows(request)
+            result = import_rows(self.model, request.user, rows)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        if result['created']:
+            cache.invalidate(request.user)
+        return Response(result, status=201 if result['created'] else 400)
+
+
+class ExportView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request: Request, fmt: str) -> StreamingHttpResponse | Response:
+        if fmt not in STREAMS:
+            return Response({'error': f"Invalid format, expected one of {', '.join(STREAMS)}"}, status=400)
+
+        kind = request.query_params.get('kind', 'all')
+        if kind == 'all':
+            kinds = tuple(MODELS)
+        elif kind in MODELS:
+            kinds = (kind,)
+        else:
+            return Response({'error': 'Invalid kind, expected income, expense or all'}, status=400)
+
+        try:
+            date_from = parse_date_param(request.query_params.get('from'), 'from')
+            date_to = parse_date_param(request.query_params.get('to'), 'to')
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+
+        rows = export_rows(request.user, kinds, date_from, date_to)
+        response = StreamingHttpResponse(STREAMS[fmt](rows), content_type=CONTENT_TYPES[fmt])
+        response['Content-Disposition'] = f'attachment; filename="ledger-{kind}.{fmt}"'
+        return response
@@ -42,13 +42,22 @@ REST_FRAMEWORK = {
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.AllowAny",
     ],
+    # Proxies in front of the app (nginx). Client IPs are taken from the address the
+    # last of them appended to X-Forwarded-For, so values sent by clients are ignored
+    "NUM_PROXIES": int(os.getenv("NUM_PROXIES", 1)),
 }
 
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=5),
     "REFRESH_TOKEN_LIFETIME": timedelta(days=7),
+    "TOKEN_USER_CLASS": "usermanagement.middleware.ClaimsUser",
 }
 
+# Authenticate from token claims without loading the user. Refreshing an access token
+# reloads the user, so deactivation takes effect when their access token expires
+JWT_STATELESS_AUTH = os.getenv("JWT_STATELESS_AUTH", "true").lower() == "true"
+AUTH_USER_CACHE_TTL = int(os.getenv("AUTH_USER_CACHE_TTL", 60))  # Seconds
+
 # Application definition
 
 INSTALLED_APPS = [
@@ -74,7 +83,6 @@ MIDDLEWARE = [
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "usermanagement.middleware.CookieJWTAuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -103,16 +111,57 @@ WSGI_APPLICATION = "backend.wsgi.application"
 # https://docs.djangoproject.com/en/5.2/ref/settings/#databases
 
 
+# Connections are kept for DB_CONN_MAX_AGE seconds and checked before reuse, instead of
+# being opened for every request. With DB_POOL (Postgres and psycopg 3 only) each
+# process keeps a psycopg pool instead; prefer it under ASGI, where persistent
+# connections are tied to short-lived threads.
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", 60))  # Seconds, 0 closes per request
+DB_CONN_HEALTH_CHECKS = os.getenv("DB_CONN_HEALTH_CHECKS", "true").lower() == "true"
+DB_POOL = os.getenv("DB_POOL", "false").lower() == "true"
+
 DATABASES = {
     "default": dj_database_url.config(
-        default=os.getenv("DATABASE_URL", "sqlite:///db.sqlite3")
+        default=os.getenv("DATABASE_URL", "sqlite:///db.sqlite3"),
+        # Django refuses persistent connections together with a pool
+        conn_max_age=0 if DB_POOL else DB_CONN_MAX_AGE,
+        conn_health_checks=DB_CONN_HEALTH_CHECKS,
     )
 }
+if DB_POOL and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", 2)),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", 10)),
+        "timeout": int(os.getenv("DB_POOL_TIMEOUT", 10)),  # Seconds to wait for a connection
+    }
 
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
+# The first hasher hashes new passwords; the others still verify older hashes, which
+# are rehashed with the first one on the next successful login. Changing a cost below
+# also rehashes on login.
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")  # "pbkdf2" or "argon2"
+_TUNED_HASHERS = {
+    "pbkdf2": "usermanagement.hashers.PBKDF2PasswordHasher",
+    "argon2": "usermanagement.hashers.Argon2PasswordHasher",
+}
+PASSWORD_HASHERS = [
+    _TUNED_HASHERS[PASSWORD_HASHER],
+    *(hasher for name, hasher in _TUNED_HASHERS.items() if name != PASSWORD_HASHER),
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+PBKDF2_ITERATIONS = int(os.getenv("PBKDF2_ITERATIONS", 1_000_000))
+ARGON2_TIME_COST = int(os.getenv("ARGON2_TIME_COST", 2))
+ARGON2_MEMORY_COST = int(os.getenv("ARGON2_MEMORY_COST", 102400))  # KiB
+ARGON2_PARALLELISM = int(os.getenv("ARGON2_PARALLELISM", 8))
+
+# Logins only check the email syntax; deliverability (DNS) is checked at registration
+LOGIN_CHECK_DELIVERABILITY = os.getenv("LOGIN_CHECK_DELIVERABILITY", "false").lower() == "true"
+# Report per-step login durations in a Server-Timing response header
+LOGIN_SERVER_TIMING = os.getenv("LOGIN_SERVER_TIMING", str(DEBUG)).lower() == "true"
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         "NAME": "django.contrib.auth.password_validation.UserAttributeSimilarityValidator",
@@ -151,11 +200,93 @@ STATIC_URL = "static/"
 
 DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
+# Income/expense listings
+LEDGER_PAGE_SIZE = int(os.getenv("LEDGER_PAGE_SIZE", 50))
+LEDGER_MAX_PAGE_SIZE = int(os.getenv("LEDGER_MAX_PAGE_SIZE", 500))
+
+# Bulk transaction imports
+LEDGER_IMPORT_BATCH_SIZE = int(os.getenv("LEDGER_IMPORT_BATCH_SIZE", 1000))
+LEDGER_IMPORT_MAX_ROWS = int(os.getenv("LEDGER_IMPORT_MAX_ROWS", 100000))
+
+# Recurring transactions: rules handled per batch, and occurrences one rule may
+# write per batch when catching up
+RECURRING_BATCH_SIZE = int(os.getenv("RECURRING_BATCH_SIZE", 1000))
+RECURRING_MAX_CATCH_UP = int(os.getenv("RECURRING_MAX_CATCH_UP", 366))
+
+# Rows fetched per server-side cursor round-trip when streaming exports
+LEDGER_EXPORT_CHUNK_SIZE = int(os.getenv("LEDGER_EXPORT_CHUNK_SIZE", 2000))
+
 CORS_ALLOW_ALL_ORIGINS = True  # Allow all origins for development; adjust in production
 CORS_ALLOWS_CREDENTIALS = True  # Allow credentials for CORS requests
 
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", "redis://localhost:6379/0")
 CELERY_RESULT_BACKEND = CELERY_BROKER_URL
+# Run tasks in the calling process, for tests and development without a worker
+CELERY_TASK_ALWAYS_EAGER = os.getenv("CELERY_TASK_ALWAYS_EAGER", "false").lower() == "true"
+
+# Cache shared by every worker: Redis at CACHE_URL, or else a database table (created
+# by migration api 0013), so cache versions bumped by one worker are seen by the others
+CACHE_URL = os.getenv("CACHE_URL")
+if CACHE_URL:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.redis.RedisCache",
+            "LOCATION": CACHE_URL,
+        }
+    }
+else:
+    CACHES = {
+        "default": {
+            "BACKEND": "django.core.cache.backends.db.DatabaseCache",
+            "LOCATION": "api_cache",
+        }
+    }
+
+# Email verification tokens: "redis", "database" (no cache) or "memory" (single
+# process only, e.g. tests)
+VERIFICATION_TOKEN_STORE = os.getenv(
+    "VERIFICATION_TOKEN_STORE", "redis" if CACHE_URL else "database"
+)
+VERIFICATION_TOKEN_REDIS_URL = os.getenv(
+    "VERIFICATION_TOKEN_REDIS_URL", CACHE_URL or CELERY_BROKER_URL
+)
+VERIFICATION_TOKEN_TTL = int(os.getenv("VERIFICATION_TOKEN_TTL", 600))  # Seconds
+
+# Blacklisted refresh tokens checked before the database: "redis", "memory" (single
+# process only) or "database" (no cache)
+TOKEN_BLACKLIST_STORE = os.getenv(
+    "TOKEN_BLACKLIST_STORE", "redis" if CACHE_URL else "database"
+)
+TOKEN_BLACKLIST_REDIS_URL = os.getenv("TOKEN_BLACKLIST_REDIS_URL", CACHE_URL or CELERY_BROKER_URL)
+TOKEN_PRUNE_BATCH_SIZE = int(os.getenv("TOKEN_PRUNE_BATCH_SIZE", 1000))
+
+# Token buckets for the unauthenticated auth endpoints, per client IP and per email.
+# A rate of "capacity/seconds" allows bursts of capacity requests, refilled over seconds.
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "true").lower() == "true"
+RATE_LIMIT_STORE = os.getenv("RATE_LIMIT_STORE", "redis" if CACHE_URL else "memory")
+RATE_LIMIT_REDIS_URL = os.getenv("RATE_LIMIT_REDIS_URL", CACHE_URL or CELERY_BROKER_URL)
+RATE_LIMITS = {
+    "login": {
+        "ip": os.getenv("LOGIN_IP_RATE", "20/60"),
+        "email": os.getenv("LOGIN_EMAIL_RATE", "5/60"),
+    },
+    "register": {
+        "ip": os.getenv("REGISTER_IP_RATE", "5/600"),
+        "email": os.getenv("REGISTER_EMAIL_RATE", "3/600"),
+    },
+    "verify": {
+        "ip": os.getenv("VERIFY_IP_RATE", "20/60"),
+        "email": os.getenv("VERIFY_EMAIL_RATE", "10/600"),
+    },
+}
+
+# Seconds a cached API response is kept, per endpoint (0 disables caching)
+RESPONSE_CACHE_TTLS = {
+    "report": int(os.getenv("REPORT_CACHE_TTL", 300)),
+    "categories": int(os.getenv("CATEGORY_CACHE_TTL", 600)),
+    "category_tree": int(os.getenv("CATEGORY_CACHE_TTL", 600)),
+    "analytics": int(os.getenv("ANALYTICS_CACHE_TTL", 300)),
+}
 
 # Celery Beat settings for periodic tasks
 CELERY_BEAT_SCHEDULE = {
@@ -163,6 +294,18 @@ CELERY_BEAT_SCHEDULE = {
         "task": "usermanagement.models.clear_verification_tokens",
         "schedule": 60.0,  # Run every 60 seconds
     },
+    "materialize-recurring-transactions": {
+        "task": "api.tasks.materialize_recurring_transactions",
+        "schedule": 3600.0,  # Run every hour
+    },
+    "reconcile-budgets": {
+        "task": "api.tasks.reconcile_budgets",
+        "schedule": 86400.0,  # Run every day
+    },
+    "prune-expired-tokens": {
+        "task": "usermanagement.tasks.prune_expired_tokens",
+        "schedule": 3600.0,  # Run every hour
+    },
 }
 CELERY_TIMEZONE = "UTC"
 
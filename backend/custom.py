@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from typing import Any, Literal
+from typing import Any, Iterable, Iterator, Literal
 
 from rest_framework.request import Request
 from rest_framework.permissions import BasePermission
@@ -8,12 +8,19 @@ from rest_framework.permissions import BasePermission
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from email_validator import EmailNotValidError, validate_email
+import contextlib
+import functools
+import html
 import smtplib
+import string
+import threading
+import time
+from pathlib import Path
 
 from dotenv import load_dotenv
 import os
 
-from cryptography.fernet import Fernet
+from cryptography.fernet import Fernet, MultiFernet
 
 from backend import settings
 
@@ -23,7 +30,9 @@ SENDER = os.getenv("EMAIL")
 S_PASS = os.getenv("EMAIL_PASS")
 EMAIL_HOST = os.getenv("EMAIL_HOST", "smtp.gmail.com")
 EMAIL_PORT = int(os.getenv("EMAIL_PORT", 465))
+EMAIL_USE_SSL = os.getenv("EMAIL_USE_SSL", "true").lower() == "true"
 ENCRYPTION_KEY = os.getenv("ENCRYPTION_KEY")
+ENCRYPTION_OLD_KEYS = os.getenv("ENCRYPTION_OLD_KEYS", "")
 
 if not SENDER or not S_PASS:
     print("WARNING: Email and Password not set in .env file")
@@ -34,8 +43,100 @@ if not ENCRYPTION_KEY:
     ENCRYPTION_KEY = key.decode()
 
 
-def sendmail(receiver: str, subject: str, html: str) -> bool:
-    if not SENDER or not S_PASS:
+class SMTPConnection:
+    """A long-lived SMTP connection, reused across messages by one process.
+
+    The connection is opened on first use and reopened once if the server dropped it
+    between messages; other failures are raised to the caller.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        port: int,
+        username: str | None,
+        password: str | None,
+        use_ssl: bool = True,
+        timeout: float = 30,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_ssl = use_ssl
+        self.timeout = timeout
+        self._smtp: smtplib.SMTP | None = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> smtplib.SMTP:
+        smtp_class = smtplib.SMTP_SSL if self.use_ssl else smtplib.SMTP
+        smtp = smtp_class(self.host, self.port, timeout=self.timeout)
+        smtp.ehlo()
+        if self.username and self.password and smtp.has_extn("auth"):
+            smtp.login(self.username, self.password)
+        return smtp
+
+    def send(self, sender: str, receiver: str, message: str) -> None:
+        with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._smtp is None:
+                        self._smtp = self._connect()
+                    self._smtp.sendmail(sender, receiver, message)
+                    return
+                except smtplib.SMTPServerDisconnected:
+                    self._smtp = None
+                    if attempt:
+                        raise
+                except Exception:
+                    self.close()
+                    raise
+
+    def close(self) -> None:
+        if self._smtp is None:
+            return
+        try:
+            self._smtp.quit()
+        except Exception:
+            pass
+        self._smtp = None
+
+
+_smtp_connection: SMTPConnection | None = None
+
+
+def get_smtp_connection() -> SMTPConnection:
+    """The SMTP connection of this process."""
+    global _smtp_connection
+    if _smtp_connection is None:
+        _smtp_connection = SMTPConnection(
+            EMAIL_HOST, EMAIL_PORT, SENDER, S_PASS, use_ssl=EMAIL_USE_SSL
+        )
+    return _smtp_connection
+
+
+def build_message(receiver: str, subject: str, html: str) -> str:
+    msg = MIMEMultipart("alternative")
+    msg["Subject"] = subject
+    msg["From"] = SENDER
+    msg["To"] = receiver
+
+    part = MIMEText(html, "html")
+    msg.attach(part)
+    return msg.as_string()
+
+
+def deliver_mail(receiver: str, subject: str, html: str) -> bool:
+    """Send an email over the process-wide SMTP connection.
+
+    Returns:
+        bool: False if the receiver address is invalid.
+
+    Raises:
+        ValueError: If the sender is not configured.
+        smtplib.SMTPException, OSError: If sending failed.
+    """
+    if not SENDER:
         raise ValueError("Email and Password not set in .env file")
     try:
         v = validate_email(receiver)
@@ -43,25 +144,29 @@ def sendmail(receiver: str, subject: str, html: str) -> bool:
     except EmailNotValidError as e:
         debug(e)
         return False
+    get_smtp_connection().send(SENDER, receiver, build_message(receiver, subject, html))
+    return True
+
+
+def sendmail(receiver: str, subject: str, html: str) -> bool:
     try:
-        msg = MIMEMultipart("alternative")
-        msg["Subject"] = subject
-        msg["From"] = SENDER
-        msg["To"] = receiver
-
-        part = MIMEText(html, "html")
-        msg.attach(part)
-
-        with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-            smtp.login(SENDER, S_PASS)
-            smtp.sendmail(SENDER, receiver, msg.as_string())
-            smtp.quit()
-        return True
-    except Exception as e:
+        return deliver_mail(receiver, subject, html)
+    except (smtplib.SMTPException, OSError) as e:
         debug(e)
         return False
 
 
+@functools.cache
+def get_cipher() -> MultiFernet:
+    """The process-wide cipher.
+
+    ``ENCRYPTION_KEY`` encrypts; it and the comma-separated ``ENCRYPTION_OLD_KEYS``
+    decrypt, so keys can be rotated without losing access to existing data.
+    """
+    keys = [ENCRYPTION_KEY, *filter(None, ENCRYPTION_OLD_KEYS.split(","))]
+    return MultiFernet([Fernet(key.strip()) for key in keys])
+
+
 def encrypt(text: str) -> str:
     """_summary_
 
@@ -71,10 +176,7 @@ def encrypt(text: str) -> str:
     Returns:
         str: Encrypted text
     """
-    fernet = Fernet(ENCRYPTION_KEY)
-    encrypted = fernet.encrypt(text.encode()).decode()
-    debug(encrypted)
-    return encrypted
+    return get_cipher().encrypt(text.encode()).decode()
 
 
 def decrypt(text: str) -> str:
@@ -86,10 +188,26 @@ def decrypt(text: str) -> str:
     Returns:
         str: Decrypted text
     """
-    fernet = Fernet(ENCRYPTION_KEY)
-    decrypted = fernet.decrypt(text.encode()).decode()
-    debug(decrypted)
-    return decrypted
+    return get_cipher().decrypt(text.encode()).decode()
+
+
+def encrypt_many(texts: Iterable[str]) -> Iterator[str]:
+    """Encrypt each text with the shared cipher."""
+    cipher = get_cipher()
+    for text in texts:
+        yield cipher.encrypt(text.encode()).decode()
+
+
+def decrypt_many(texts: Iterable[str]) -> Iterator[str]:
+    """Decrypt each text with the shared cipher."""
+    cipher = get_cipher()
+    for text in texts:
+        yield cipher.decrypt(text.encode()).decode()
+
+
+def rotate(text: str) -> str:
+    """Re-encrypt a token made with any configured key under the current key."""
+    return get_cipher().rotate(text.encode()).decode()
 
 
 def debug(
@@ -103,6 +221,25 @@ def debug(
         print(*values, sep=sep, end=end, file=file, flush=flush)
 
 
+class StepTimer:
+    """Wall-clock duration of named steps, in milliseconds."""
+
+    def __init__(self) -> None:
+        self.steps: dict[str, float] = {}
+
+    @contextlib.contextmanager
+    def step(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.steps[name] = self.steps.get(name, 0) + (time.perf_counter() - started) * 1000
+
+    def server_timing(self) -> str:
+        """The steps as a ``Server-Timing`` header value."""
+        return ", ".join(f"{name};dur={duration:.1f}" for name, duration in self.steps.items())
+
+
 class IsStaff(BasePermission):
     """
     Custom permission to only allow staff members to access certain views.
@@ -123,10 +260,77 @@ class IsAdmin(BasePermission):
         return request.user.is_authenticated and request.user.is_superuser
 
 
+class EmailTemplate:
+    """An email template parsed once into literal text and ``str.format`` fields."""
+
+    formatter = string.Formatter()
+
+    def __init__(self, path: Path, compiled: bool = True) -> None:
+        self.path = path
+        self.compiled = compiled
+        self.load()
+
+    def load(self) -> None:
+        self.mtime = self.path.stat().st_mtime
+        self.source = self.path.read_text(encoding="utf-8")
+        self.parts = list(self.formatter.parse(self.source)) if self.compiled else []
+
+    def reload_if_changed(self) -> None:
+        if self.path.stat().st_mtime != self.mtime:
+            self.load()
+
+    def render(self, **kwargs: Any) -> str:
+        """Fill the fields with HTML-escaped values."""
+        if not self.compiled:
+            return self.source
+        rendered = []
+        for literal, field_name, format_spec, conversion in self.parts:
+            rendered.append(literal)
+            if field_name is None:
+                continue
+            value, _ = self.formatter.get_field(field_name, (), kwargs)
+            value = self.formatter.convert_field(value, conversion)
+            value = self.formatter.format_field(value, format_spec or "")
+            rendered.append(html.escape(value))
+        return "".join(rendered)
+
+
+class EmailTemplateRegistry:
+    """Email templates kept in memory, reloaded on change only when DEBUG is on.
+
+    ``base.html`` is prepended as-is to every template; it holds the CSS, whose
+    braces are not format fields.
+    """
+
+    BASE = "base"
+
+    def __init__(self, directory: Path) -> None:
+        self.directory = directory
+        self.templates: dict[str, EmailTemplate] = {}
+
+    def load(self) -> None:
+        for path in sorted(self.directory.glob("*.html")):
+            self.templates[path.stem] = EmailTemplate(path, compiled=path.stem != self.BASE)
+
+    def get(self, name: str) -> EmailTemplate:
+        template = self.templates.get(name)
+        if template is None:
+            path = self.directory / f"{name}.html"
+            if not path.is_file():
+                raise FileNotFoundError(f"Email template not found: {name}")
+            template = EmailTemplate(path, compiled=name != self.BASE)
+            self.templates[name] = template
+        elif settings.DEBUG:
+            template.reload_if_changed()
+        return template
+
+    def render(self, name: str, **kwargs: Any) -> str:
+        return self.get(self.BASE).render() + self.get(name).render(**kwargs)
+
+
+email_templates = EmailTemplateRegistry(settings.BASE_DIR / "email_templates")
+
+
 def get_template(name: str, **kwargs: Any) -> str:
     """Get Email Template"""
-    with open("email_templates/base.html", "r") as f:
-        base_template = f.read()
-    with open(f"email_templates/{name}.html", "r") as f:
-        template = f.read()
-    return base_template + template.format(**kwargs)
+    return email_templates.render(name, **kwargs)
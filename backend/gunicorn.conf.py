@@ -0,0 +1,40 @@
+"""
+Gunicorn settings for serving the backend in production.
+
+Every setting can be tuned from the environment. By default the WSGI app is served by
+threaded sync workers; set GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker to serve
+backend.asgi instead.
+"""
+
+import multiprocessing
+import os
+
+ASGI_WORKERS = ("uvicorn_worker.UvicornWorker", "uvicorn.workers.UvicornWorker")
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "gthread")
+wsgi_app = os.getenv(
+    "GUNICORN_APP",
+    "backend.asgi:application" if worker_class in ASGI_WORKERS else "backend.wsgi:application",
+)
+
+# Requests are mostly CPU (password hashing, JSON) with short database waits
+workers = int(os.getenv("GUNICORN_WORKERS", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", 4))  # Per worker, gthread only
+
+timeout = int(os.getenv("GUNICORN_TIMEOUT", 60))  # Seconds
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", 5))
+
+# Recycle workers now and then so slow leaks cannot grow without bound
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = int(os.getenv("GUNICORN_MAX_REQUESTS_JITTER", 500))
+
+# Restart workers when code changes, for development only
+reload = os.getenv("GUNICORN_RELOAD", "false").lower() == "true"
+# Load the app once before forking so workers share its memory (not possible with reload)
+preload_app = os.getenv("GUNICORN_PRELOAD", "true").lower() == "true" and not reload
+
+accesslog = os.getenv("GUNICORN_ACCESS_LOG", "-") or None  # Empty disables it
+errorlog = "-"
+loglevel = os.getenv("GUNICORN_LOG_LEVEL", "info")
@@ -4,3 +4,8 @@ from django.apps import AppConfig
 class AuthConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "usermanagement"
+
+    def ready(self) -> None:
+        from custom import email_templates
+
+        email_templates.load()
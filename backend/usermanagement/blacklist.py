@@ -0,0 +1,149 @@
+from __future__ import annotations
+
+import functools
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken
+
+
+class BlacklistStore(ABC):
+    """Blacklisted refresh token ids (jti) with the time their token expires.
+
+    A token only needs to stay listed until it expires; after that it is rejected
+    for being expired, so expired entries can be dropped.
+    """
+
+    @abstractmethod
+    def contains(self, jti: str) -> Optional[bool]:
+        """Whether ``jti`` is blacklisted, or None if the store cannot tell."""
+
+    @abstractmethod
+    def add(self, jti: str, expires: float) -> None:
+        """Add ``jti`` until the epoch timestamp ``expires``."""
+
+    def add_many(self, entries: Iterable[tuple[str, float]]) -> None:
+        for jti, expires in entries:
+            self.add(jti, expires)
+
+    def purge_expired(self) -> int:
+        """Drop expired entries. Returns how many were removed."""
+        return 0
+
+
+class DatabaseBlacklistStore(BlacklistStore):
+    """No cache: every check queries the ``BlacklistedToken`` table."""
+
+    def contains(self, jti: str) -> Optional[bool]:
+        return None
+
+    def add(self, jti: str, expires: float) -> None:
+        pass
+
+
+class MemoryBlacklistStore(BlacklistStore):
+    """A per-process store, for tests and single-process development servers.
+
+    It is filled from the database on first use; tokens blacklisted by another
+    process afterwards are not seen.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[str, float] = {}
+        self._loaded = False
+        self._lock = threading.Lock()
+
+    def contains(self, jti: str) -> Optional[bool]:
+        if not self._loaded:
+            with self._lock:
+                if not self._loaded:
+                    for entry in _live_entries():
+                        self._entries.setdefault(*entry)
+                    self._loaded = True
+        expires = self._entries.get(jti)
+        return expires is not None and expires > time.time()
+
+    def add(self, jti: str, expires: float) -> None:
+        with self._lock:
+            self._entries[jti] = expires
+
+    def purge_expired(self) -> int:
+        now = time.time()
+        with self._lock:
+            expired = [jti for jti, expires in self._entries.items() if expires <= now]
+            for jti in expired:
+                del self._entries[jti]
+        return len(expired)
+
+
+class RedisBlacklistStore(BlacklistStore):
+    """A store shared by every worker: a sorted set of jti scored by expiry.
+
+    A marker key records that the set holds every live blacklisted token. While it
+    is missing (a new or flushed Redis) checks fall back to the database and the
+    set is refilled from it.
+    """
+
+    KEY = "token-blacklist"
+    LOADED_KEY = "token-blacklist:loaded"
+
+    def __init__(self, url: str) -> None:
+        import redis
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def _load(self) -> None:
+        batch = []
+        for entry in _live_entries():
+            batch.append(entry)
+            if len(batch) >= settings.TOKEN_PRUNE_BATCH_SIZE:
+                self.add_many(batch)
+                batch = []
+        self.add_many(batch)
+        self._redis.set(self.LOADED_KEY, 1)
+
+    def contains(self, jti: str) -> Optional[bool]:
+        pipeline = self._redis.pipeline()
+        loaded, expires = pipeline.exists(self.LOADED_KEY).zscore(self.KEY, jti).execute()
+        if not loaded:
+            self._load()
+            return None
+        return expires is not None and expires > time.time()
+
+    def add(self, jti: str, expires: float) -> None:
+        self._redis.zadd(self.KEY, {jti: expires})
+
+    def add_many(self, entries: Iterable[tuple[str, float]]) -> None:
+        mapping = dict(entries)
+        if mapping:
+            self._redis.zadd(self.KEY, mapping)
+
+    def purge_expired(self) -> int:
+        return self._redis.zremrangebyscore(self.KEY, "-inf", time.time())
+
+
+def _live_entries() -> Iterable[tuple[str, float]]:
+    rows = (
+        BlacklistedToken.objects.filter(token__expires_at__gt=timezone.now())
+        .values_list("token__jti", "token__expires_at")
+    )
+    for jti, expires in rows.iterator(chunk_size=settings.TOKEN_PRUNE_BATCH_SIZE):
+        yield jti, expires.timestamp()
+
+
+@functools.cache
+def get_blacklist() -> BlacklistStore:
+    """The store configured by ``TOKEN_BLACKLIST_STORE`` (``redis``, ``memory`` or ``database``)."""
+    match settings.TOKEN_BLACKLIST_STORE:
+        case "redis":
+            return RedisBlacklistStore(settings.TOKEN_BLACKLIST_REDIS_URL)
+        case "memory":
+            return MemoryBlacklistStore()
+        case "database":
+            return DatabaseBlacklistStore()
+        case backend:
+            raise ValueError(f"Unknown token blacklist store: {backend}")
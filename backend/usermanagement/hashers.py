@@ -0,0 +1,35 @@
+from __future__ import annotations
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class Argon2PasswordHasher(hashers.Argon2PasswordHasher):
+    """Argon2id with the costs set by ``ARGON2_TIME_COST``, ``ARGON2_MEMORY_COST``
+    (KiB) and ``ARGON2_PARALLELISM``.
+
+    Hashes made with other costs still verify and are rehashed on the next login.
+    """
+
+    @property
+    def time_cost(self) -> int:
+        return settings.ARGON2_TIME_COST
+
+    @property
+    def memory_cost(self) -> int:
+        return settings.ARGON2_MEMORY_COST
+
+    @property
+    def parallelism(self) -> int:
+        return settings.ARGON2_PARALLELISM
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 with ``PBKDF2_ITERATIONS`` iterations.
+
+    Hashes made with another count still verify and are rehashed on the next login.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return settings.PBKDF2_ITERATIONS
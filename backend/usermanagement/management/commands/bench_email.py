@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+import custom
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure email throughput against the configured SMTP server, reusing one "
+        "connection versus connecting per message. Point EMAIL_HOST/EMAIL_PORT at a "
+        "local stand-in (e.g. `python -m aiosmtpd -n -l localhost:1025` with "
+        "EMAIL_USE_SSL=false) rather than a real provider."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=200, help="Messages per run.")
+        parser.add_argument("--to", default="bench@example.com", help="Receiver address.")
+
+    def run(self, count, receiver, reuse):
+        message = custom.build_message(receiver, "Benchmark", "<p>Benchmark</p>")
+        connection = None
+        started = time.perf_counter()
+        for _ in range(count):
+            if connection is None or not reuse:
+                if connection is not None:
+                    connection.close()
+                connection = custom.SMTPConnection(
+                    custom.EMAIL_HOST,
+                    custom.EMAIL_PORT,
+                    custom.SENDER,
+                    custom.S_PASS,
+                    use_ssl=custom.EMAIL_USE_SSL,
+                )
+            connection.send(custom.SENDER, receiver, message)
+        connection.close()
+        return count / (time.perf_counter() - started)
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"SMTP server: {custom.EMAIL_HOST}:{custom.EMAIL_PORT}")
+        for label, reuse in (("connection per message", False), ("reused connection", True)):
+            rate = self.run(options["count"], options["to"], reuse)
+            self.stdout.write(f"{label}: {rate:.1f} messages/s")
@@ -0,0 +1,86 @@
+import statistics
+import time
+
+from django.contrib.auth.hashers import check_password, make_password
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.test import override_settings
+
+from custom import StepTimer
+from usermanagement.models import AuthAcc, authenticate
+
+PASSWORD = "correct horse battery staple"
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure password hashing cost for PBKDF2 iteration counts and Argon2 costs, "
+        "then time each step of a login with the configured hasher."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--count", type=int, default=5, help="Hashes per setting.")
+        parser.add_argument(
+            "--pbkdf2-iterations",
+            type=int,
+            nargs="*",
+            default=[260_000, 600_000, 1_000_000],
+        )
+        parser.add_argument(
+            "--argon2",
+            nargs="*",
+            default=["2:19456:1", "2:102400:8", "3:65536:4"],
+            metavar="TIME:MEMORY_KIB:PARALLELISM",
+        )
+
+    def measure(self, count, **overrides):
+        with override_settings(**overrides):
+            encoded = make_password(PASSWORD)
+            timings = []
+            for _ in range(count):
+                started = time.perf_counter()
+                check_password(PASSWORD, encoded)
+                timings.append((time.perf_counter() - started) * 1000)
+        return statistics.median(timings)
+
+    def handle(self, *args, **options):
+        count = options["count"]
+        self.stdout.write("Verify time per password (median):")
+        for iterations in options["pbkdf2_iterations"]:
+            median = self.measure(
+                count,
+                PBKDF2_ITERATIONS=iterations,
+                PASSWORD_HASHERS=["usermanagement.hashers.PBKDF2PasswordHasher"],
+            )
+            self.stdout.write(f"  pbkdf2 iterations={iterations}: {median:.1f} ms")
+        for spec in options["argon2"]:
+            time_cost, memory_cost, parallelism = (int(part) for part in spec.split(":"))
+            try:
+                median = self.measure(
+                    count,
+                    ARGON2_TIME_COST=time_cost,
+                    ARGON2_MEMORY_COST=memory_cost,
+                    ARGON2_PARALLELISM=parallelism,
+                    PASSWORD_HASHERS=["usermanagement.hashers.Argon2PasswordHasher"],
+                )
+            except ValueError as e:
+                # argon2-cffi is not installed
+                self.stdout.write(f"  argon2 {spec}: skipped ({e})")
+                continue
+            self.stdout.write(f"  argon2 {spec}: {median:.1f} ms")
+
+        self.stdout.write("Login steps with the configured hasher (median):")
+        steps: dict[str, list[float]] = {}
+        with transaction.atomic():
+            user = AuthAcc(email="bench-login@example.com", username="bench", verified=True)
+            user.set_password(PASSWORD)
+            user.save()
+            for _ in range(count):
+                timer = StepTimer()
+                authenticate(user.email, PASSWORD, timer=timer)
+                for name, duration in timer.steps.items():
+                    steps.setdefault(name, []).append(duration)
+            # Leave no benchmark user behind
+            transaction.set_rollback(True)
+        for name, durations in steps.items():
+            self.stdout.write(f"  {name}: {statistics.median(durations):.2f} ms")
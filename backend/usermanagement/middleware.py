@@ -1,22 +1,108 @@
-from django.utils.deprecation import MiddlewareMixin
+from __future__ import annotations
+
+from typing import Any, Optional
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import HttpRequest
+from django.utils.functional import cached_property
+from django.utils.translation import gettext_lazy as _
 from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken, Token
+from rest_framework_simplejwt.utils import datetime_from_epoch
+
+from .blacklist import get_blacklist
+from .models import AuthAcc, get_cached_user
+
+# Claims copied from the user into every token, enough to serve most requests
+USER_CLAIMS = ("email", "username", "is_staff", "is_superuser", "verified")
 
 
-class CookieJWTAuthenticationMiddleware(MiddlewareMixin):
+class ClaimsRefreshToken(RefreshToken):
     """
-    Middleware to authenticate users using JWT tokens from cookies.
-    This allows DRF to work with httpOnly cookies.
+    A refresh token (and derived access tokens) carrying ``USER_CLAIMS``.
+    Blacklist checks go through the blacklist store before the database.
     """
-    
-    def process_request(self, request):
-        # Get the access token from cookies
-        access_token = request.COOKIES.get('access_token')
-        
-        if access_token:
-            # Create a fake Authorization header for DRF JWT authentication
-            request.META['HTTP_AUTHORIZATION'] = f'Bearer {access_token}'
-        
-        return None
+
+    @classmethod
+    def for_user(cls, user: AuthAcc) -> ClaimsRefreshToken:
+        token = super().for_user(user)
+        for claim in USER_CLAIMS:
+            token[claim] = getattr(user, claim)
+        return token
+
+    def access_token_for(self, user: AuthAcc) -> AccessToken:
+        """An access token with the claims of ``user`` as it is now, not as copied
+        into this refresh token when it was issued.
+        """
+        access = self.access_token
+        for claim in USER_CLAIMS:
+            access[claim] = getattr(user, claim)
+        return access
+
+    def check_blacklist(self) -> None:
+        jti = self.payload[api_settings.JTI_CLAIM]
+        blacklisted = get_blacklist().contains(jti)
+        if blacklisted is None:
+            blacklisted = BlacklistedToken.objects.filter(token__jti=jti).exists()
+        if blacklisted:
+            raise TokenError(_("Token is blacklisted"))
+
+    def blacklist(self) -> tuple[BlacklistedToken, bool]:
+        jti = self.payload[api_settings.JTI_CLAIM]
+        exp = self.payload["exp"]
+        token, _created = OutstandingToken.objects.get_or_create(
+            jti=jti,
+            defaults={
+                "user_id": self.payload.get(api_settings.USER_ID_CLAIM),
+                "created_at": self.current_time,
+                "token": str(self),
+                "expires_at": datetime_from_epoch(exp),
+            },
+        )
+        result = BlacklistedToken.objects.get_or_create(token=token)
+        get_blacklist().add(jti, exp)
+        return result
+
+
+class ClaimsUser(TokenUser):
+    """
+    A user built from the claims of a validated token, without a database query.
+    Views that need the full model use ``instance``, which is served from the
+    short-lived user cache.
+    """
+
+    @cached_property
+    def id(self) -> int:
+        # The claim holds the id as a string; model instances and lookups expect an int
+        return int(self.token[api_settings.USER_ID_CLAIM])
+
+    @cached_property
+    def email(self) -> str:
+        return self.token.get("email", "")
+
+    @cached_property
+    def verified(self) -> bool:
+        return self.token.get("verified", False)
+
+    @property
+    def is_verified(self) -> bool:
+        return self.verified
+
+    @property
+    def is_admin(self) -> bool:
+        return self.is_staff or self.is_superuser
+
+    @cached_property
+    def instance(self) -> Optional[AuthAcc]:
+        return get_cached_user(self.id)
+
+    def __str__(self) -> str:
+        return self.email
 
 
 class CookieJWTAuthentication(JWTAuthentication):
@@ -38,3 +124,28 @@ class CookieJWTAuthentication(JWTAuthentication):
         
         # Fall back to standard authentication (Authorization header)
         return super().get_header(request)
+
+    def get_user(self, validated_token: Token) -> Any:
+        """
+        With JWT_STATELESS_AUTH, return a ClaimsUser for tokens that carry the user
+        claims. Tokens issued before the claims were added fall back to a lookup.
+        """
+        if settings.JWT_STATELESS_AUTH and "email" in validated_token:
+            return ClaimsUser(validated_token)
+        return super().get_user(validated_token)
+
+    async def aauthenticate(self, request: HttpRequest) -> Optional[tuple[Any, Token]]:
+        """
+        Authenticate a plain Django request from an async view. Token-backed users need
+        no database, so only the fallback lookup runs in a thread.
+        """
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        if settings.JWT_STATELESS_AUTH and "email" in validated_token:
+            return ClaimsUser(validated_token), validated_token
+        return await sync_to_async(self.get_user)(validated_token), validated_token
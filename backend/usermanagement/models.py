@@ -2,9 +2,13 @@ from __future__ import annotations
 
 from typing import Any, Optional
 
+from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
+from django.core.cache import cache
 from django.db import models
 from django.db.models import *
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
 from django.utils.translation import gettext_lazy as _
 
 from email_validator import EmailNotValidError, validate_email
@@ -14,35 +18,27 @@ import datetime
 import random
 import string
 
-from custom import debug
+from custom import StepTimer, debug
+
+from .tokens import get_store
 
 # Create your models here.
 
 alpha = string.ascii_uppercase
 digits = string.digits
 
-VERIFICATION_TOKENS: list[VerificationToken] = []
-
 
 @shared_task
 def clear_verification_tokens() -> None:
     """Clear expired verification tokens."""
-    global VERIFICATION_TOKENS
     debug("Checking for expired verification tokens...")
-    expired: list[VerificationToken] = []
-    for token in VERIFICATION_TOKENS[
-        :
-    ]:  # Create a copy to avoid modification during iteration
-        token.timeout -= 1
-        if token.timeout <= 0:
-            expired.append(token)
-    for token in expired:
-        token.del_self()
+    removed = get_store().purge_expired()
+    if removed:
+        debug(f"Removed {removed} expired verification tokens")
 
 
 class VerificationToken:
-    token: str
-    timeout: int
+    REASONS = ("email_verification",)
 
     def __init__(self, user: AuthAcc, reason: str) -> None:
         self.user = user
@@ -64,53 +60,39 @@ class VerificationToken:
         Returns:
             str: TOKEN
         """
-        usertoken = VerificationToken.get_user(self.user)
-        if usertoken:
-            if new:
-                token = self._gen()
-                usertoken.token = token
-            usertoken.timeout = 10
-            return usertoken.token
+        store = get_store()
+        ttl = settings.VERIFICATION_TOKEN_TTL
+        if not new:
+            token = store.get(self.user.pk, self.reason)
+            if token and store.touch(self.user.pk, self.reason, ttl):
+                return token
         token = self._gen()
-        self.token = token
-        self.timeout = 10
-        VERIFICATION_TOKENS.append(self)
-        return self.token
+        store.set(self.user.pk, self.reason, token, ttl)
+        return token
 
     @staticmethod
-    def check(user: AuthAcc, token: str, reason: str) -> bool:
-        usertoken = VerificationToken.get_user(user)
+    def check(user: Optional[AuthAcc], token: str, reason: str) -> bool:
+        usertoken = get_store().get(user.pk, reason) if user else None
         if not usertoken:
             raise ValueError("User Token Not Found")
-        if usertoken.token == token:
-            if usertoken.reason == reason:
-                usertoken.del_self()
-                return True
-            else:
-                raise ValueError("Invalid Reason")
+        if usertoken == token:
+            VerificationToken.delete(user, reason)
+            return True
         return False
 
     @staticmethod
-    def get_user(user: AuthAcc) -> Optional[VerificationToken]:
-        for token in VERIFICATION_TOKENS:
-            if token.user == user:
-                return token
-        return None
+    def get_user(user: AuthAcc, reason: str = "email_verification") -> Optional[str]:
+        return get_store().get(user.pk, reason)
 
     def del_self(self) -> None:
-        token = VerificationToken.get_user(self.user)
-        if token:
-            VERIFICATION_TOKENS.remove(token)
-            del token
-            del self
-        else:
-            del self
+        VerificationToken.delete(self.user, self.reason)
 
     @staticmethod
-    def delete(user: AuthAcc) -> None:
-        token = VerificationToken.get_user(user)
-        if token:
-            token.del_self()
+    def delete(user: AuthAcc, reason: Optional[str] = None) -> None:
+        """Delete the user's token for ``reason``, or for every reason."""
+        store = get_store()
+        for token_reason in (reason,) if reason else VerificationToken.REASONS:
+            store.delete(user.pk, token_reason)
 
 
 class AuthAccManager(BaseUserManager):
@@ -256,17 +238,74 @@ class AuthAcc(AbstractBaseUser):
         self.save(update_fields=["last_login"])
 
 
-def authenticate(email: str, password: str) -> Optional[AuthAcc]:
-    try:
-        validate_email(email)
-    except EmailNotValidError:
-        return None
-    self = AuthAccManager()
-    user = self.get_user(email=email)
+class StoredVerificationToken(models.Model):
+    """A verification token of the ``database`` token store (see ``tokens``)."""
+
+    user = models.ForeignKey(AuthAcc, on_delete=CASCADE, related_name="+")
+    reason = models.CharField(max_length=50)
+    token = models.CharField(max_length=16)
+    expires = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(fields=["user", "reason"], name="unique_verification_token"),
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.reason} token of user {self.user_id}"
+
+
+def authenticate(
+    email: str, password: str, timer: Optional[StepTimer] = None
+) -> Optional[AuthAcc]:
+    """Check the credentials of a login.
+
+    The email is only checked for syntax unless ``LOGIN_CHECK_DELIVERABILITY`` is set;
+    its domain was already checked at registration. A password hashed with an older
+    hasher or cost is rehashed with the current one.
+
+    Args:
+        timer (StepTimer, optional): Records the duration of each step.
+
+    Raises:
+        ValueError: If the user has not verified their email.
+
+    Returns:
+        Optional[AuthAcc]: The user, or None if the credentials are wrong.
+    """
+    timer = timer or StepTimer()
+    with timer.step("validate_email"):
+        try:
+            validate_email(email, check_deliverability=settings.LOGIN_CHECK_DELIVERABILITY)
+        except EmailNotValidError:
+            return None
+    with timer.step("get_user"):
+        user = AuthAccManager().get_user(email=email)
     if not user:
         return None
     if not user.verified:
         raise ValueError("User Not Verified")
-    if user.check_password(password):
-        return user
+    with timer.step("check_password"):
+        if user.check_password(password):
+            return user
     return None
+
+
+USER_CACHE_KEY = "auth-user:{}"
+
+
+def get_cached_user(user_id: Any) -> Optional[AuthAcc]:
+    """Load a user, keeping it in the cache for ``AUTH_USER_CACHE_TTL`` seconds."""
+    key = USER_CACHE_KEY.format(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = AuthAcc.objects.filter(pk=user_id).first()
+        if user:
+            cache.set(key, user, timeout=settings.AUTH_USER_CACHE_TTL)
+    return user
+
+
+@receiver(post_save, sender=AuthAcc)
+@receiver(post_delete, sender=AuthAcc)
+def forget_cached_user(sender: type[AuthAcc], instance: AuthAcc, **kwargs: Any) -> None:
+    cache.delete(USER_CACHE_KEY.format(instance.pk))
@@ -0,0 +1,55 @@
+from __future__ import annotations
+
+import smtplib
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from rest_framework_simplejwt.token_blacklist.models import BlacklistedToken, OutstandingToken
+
+from custom import debug, deliver_mail
+
+from .blacklist import get_blacklist
+
+
+@shared_task(
+    autoretry_for=(smtplib.SMTPException, OSError),
+    retry_backoff=True,
+    retry_backoff_max=600,
+    retry_jitter=True,
+    max_retries=5,
+)
+def send_email(receiver: str, subject: str, html: str) -> bool:
+    """Send an email from a Celery worker, retrying with exponential backoff."""
+    sent = deliver_mail(receiver, subject, html)
+    if not sent:
+        debug(f"Not sending email to invalid address {receiver}")
+    return sent
+
+
+@shared_task
+def prune_expired_tokens() -> int:
+    """Delete expired outstanding and blacklisted refresh tokens.
+
+    Rows are deleted in batches of ``TOKEN_PRUNE_BATCH_SIZE`` so each delete holds its
+    locks briefly. Blacklisted tokens go with their outstanding token (``CASCADE``).
+
+    Returns:
+        int: The number of outstanding tokens deleted.
+    """
+    now = timezone.now()
+    batch_size = settings.TOKEN_PRUNE_BATCH_SIZE
+    expired = (
+        OutstandingToken.objects.filter(expires_at__lte=now)
+        .order_by()
+        .values_list("pk", flat=True)
+    )
+    removed = 0
+    while batch := list(expired[:batch_size]):
+        BlacklistedToken.objects.filter(token_id__in=batch).delete()
+        OutstandingToken.objects.filter(pk__in=batch).delete()
+        removed += len(batch)
+    get_blacklist().purge_expired()
+    if removed:
+        debug(f"Removed {removed} expired refresh tokens")
+    return removed
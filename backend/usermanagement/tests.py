@@ -0,0 +1,99 @@
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from .middleware import ClaimsRefreshToken, CookieJWTAuthentication
+from .models import AuthAcc
+from .ratelimit import get_store
+from .tokens import DatabaseTokenStore
+
+
+def make_user(email: str, **fields) -> AuthAcc:
+    user = AuthAcc(email=email, username=email.split("@")[0], verified=True, **fields)
+    user.set_password("pw123456")
+    user.save()
+    return user
+
+
+class ClaimsUserTests(TestCase):
+    def test_id_is_an_int(self):
+        user = make_user("claims@example.com")
+        token = ClaimsRefreshToken.for_user(user).access_token
+        claims_user = CookieJWTAuthentication().get_user(token)
+        self.assertEqual(claims_user.id, user.pk)
+        self.assertEqual(claims_user.pk, user.pk)
+        self.assertIsInstance(claims_user.pk, int)
+
+
+class TokenRefreshTests(TestCase):
+    url = "/api/auth/token/refresh/"
+
+    def setUp(self):
+        self.user = make_user("refresh@example.com")
+        self.refresh = str(ClaimsRefreshToken.for_user(self.user))
+
+    def test_claims_are_reloaded(self):
+        self.user.is_staff = True
+        self.user.save()
+        response = APIClient().post(self.url, {"refresh": self.refresh}, format="json")
+        self.assertEqual(response.status_code, 200)
+        access = CookieJWTAuthentication().get_validated_token(response.data["access"])
+        self.assertTrue(access["is_staff"])
+
+    def test_inactive_user_is_refused(self):
+        self.user.is_active = False
+        self.user.save()
+        response = APIClient().post(self.url, {"refresh": self.refresh}, format="json")
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn("access", response.data)
+
+
+@override_settings(RATE_LIMIT_ENABLED=True, RATE_LIMIT_STORE="memory")
+class LoginRateLimitTests(TestCase):
+    url = "/api/auth/login/"
+
+    def setUp(self):
+        get_store.cache_clear()
+        self.addCleanup(get_store.cache_clear)
+
+    def login(self, index: int, forwarded_for: str):
+        # A different email each time, so only the per-IP bucket can run out
+        return APIClient().post(
+            self.url,
+            {"email": f"nobody{index}@example.com", "password": "wrong"},
+            format="json",
+            HTTP_X_FORWARDED_FOR=forwarded_for,
+        )
+
+    def test_spoofed_forwarded_for_shares_the_client_bucket(self):
+        # nginx appends the address it saw to whatever the client sent
+        statuses = [
+            self.login(index, f"10.0.{index}.1, 203.0.113.7").status_code
+            for index in range(30)
+        ]
+        self.assertEqual(statuses.count(429), 10)
+
+    def test_clients_behind_the_proxy_get_their_own_buckets(self):
+        statuses = [
+            self.login(index, f"203.0.113.{index}").status_code for index in range(30)
+        ]
+        self.assertNotIn(429, statuses)
+
+
+class DatabaseTokenStoreTests(TestCase):
+    def setUp(self):
+        self.user = make_user("tokens@example.com")
+        self.store = DatabaseTokenStore()
+
+    def test_set_get_and_delete(self):
+        self.store.set(self.user.pk, "email_verification", "ABC123", ttl=60)
+        self.store.set(self.user.pk, "email_verification", "XYZ789", ttl=60)
+        self.assertEqual(self.store.get(self.user.pk, "email_verification"), "XYZ789")
+        self.assertTrue(self.store.touch(self.user.pk, "email_verification", ttl=60))
+        self.store.delete(self.user.pk, "email_verification")
+        self.assertIsNone(self.store.get(self.user.pk, "email_verification"))
+        self.assertFalse(self.store.touch(self.user.pk, "email_verification", ttl=60))
+
+    def test_expired_tokens_are_hidden_and_purged(self):
+        self.store.set(self.user.pk, "email_verification", "ABC123", ttl=0)
+        self.assertIsNone(self.store.get(self.user.pk, "email_verification"))
+        self.assertEqual(self.store.purge_expired(), 1)
@@ -0,0 +1,159 @@
+from __future__ import annotations
+
+import datetime
+import functools
+import heapq
+import threading
+import time
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from django.conf import settings
+from django.utils import timezone
+
+
+class TokenStore(ABC):
+    """Verification tokens keyed by user and reason, each with its own expiry."""
+
+    @abstractmethod
+    def get(self, user_id: int, reason: str) -> Optional[str]:
+        """Return the live token of ``user_id`` for ``reason``, if any."""
+
+    @abstractmethod
+    def set(self, user_id: int, reason: str, token: str, ttl: int) -> None:
+        """Store ``token``, replacing any previous one, for ``ttl`` seconds."""
+
+    @abstractmethod
+    def touch(self, user_id: int, reason: str, ttl: int) -> bool:
+        """Extend the expiry of an existing token. Returns False if there is none."""
+
+    @abstractmethod
+    def delete(self, user_id: int, reason: str) -> None:
+        """Delete the token of ``user_id`` for ``reason``, if any."""
+
+    def purge_expired(self) -> int:
+        """Drop expired tokens. Returns how many were removed."""
+        return 0
+
+
+class MemoryTokenStore(TokenStore):
+    """A per-process store, for tests and single-process development servers.
+
+    Expiries are kept in a heap, so a purge only looks at the tokens that expired.
+    """
+
+    def __init__(self) -> None:
+        self._tokens: dict[tuple[int, str], tuple[str, float]] = {}
+        self._expiries: list[tuple[float, tuple[int, str]]] = []
+        self._lock = threading.Lock()
+
+    def get(self, user_id: int, reason: str) -> Optional[str]:
+        entry = self._tokens.get((user_id, reason))
+        if entry is None or entry[1] <= time.monotonic():
+            return None
+        return entry[0]
+
+    def _store(self, key: tuple[int, str], token: str, ttl: int) -> None:
+        expires = time.monotonic() + ttl
+        self._tokens[key] = (token, expires)
+        heapq.heappush(self._expiries, (expires, key))
+
+    def set(self, user_id: int, reason: str, token: str, ttl: int) -> None:
+        with self._lock:
+            self._store((user_id, reason), token, ttl)
+
+    def touch(self, user_id: int, reason: str, ttl: int) -> bool:
+        with self._lock:
+            token = self.get(user_id, reason)
+            if token is None:
+                return False
+            self._store((user_id, reason), token, ttl)
+            return True
+
+    def delete(self, user_id: int, reason: str) -> None:
+        with self._lock:
+            self._tokens.pop((user_id, reason), None)
+
+    def purge_expired(self) -> int:
+        removed = 0
+        now = time.monotonic()
+        with self._lock:
+            while self._expiries and self._expiries[0][0] <= now:
+                expires, key = heapq.heappop(self._expiries)
+                entry = self._tokens.get(key)
+                # Skip heap entries superseded by a later set or touch
+                if entry is not None and entry[1] == expires:
+                    del self._tokens[key]
+                    removed += 1
+        return removed
+
+
+class RedisTokenStore(TokenStore):
+    """A store shared by every web and Celery worker. Redis expires the keys itself."""
+
+    KEY = "verification-token:{reason}:{user_id}"
+
+    def __init__(self, url: str) -> None:
+        import redis
+
+        self._redis = redis.Redis.from_url(url, decode_responses=True)
+
+    def _key(self, user_id: int, reason: str) -> str:
+        return self.KEY.format(reason=reason, user_id=user_id)
+
+    def get(self, user_id: int, reason: str) -> Optional[str]:
+        return self._redis.get(self._key(user_id, reason))
+
+    def set(self, user_id: int, reason: str, token: str, ttl: int) -> None:
+        self._redis.set(self._key(user_id, reason), token, ex=ttl)
+
+    def touch(self, user_id: int, reason: str, ttl: int) -> bool:
+        return bool(self._redis.expire(self._key(user_id, reason), ttl))
+
+    def delete(self, user_id: int, reason: str) -> None:
+        self._redis.delete(self._key(user_id, reason))
+
+
+class DatabaseTokenStore(TokenStore):
+    """A store shared by every worker without a cache, in the ``StoredVerificationToken`` table."""
+
+    def __init__(self) -> None:
+        from .models import StoredVerificationToken  # The models module imports this one
+
+        self._tokens = StoredVerificationToken.objects
+
+    def _live(self, user_id: int, reason: str):
+        return self._tokens.filter(user_id=user_id, reason=reason, expires__gt=timezone.now())
+
+    def get(self, user_id: int, reason: str) -> Optional[str]:
+        return self._live(user_id, reason).values_list("token", flat=True).first()
+
+    def set(self, user_id: int, reason: str, token: str, ttl: int) -> None:
+        expires = timezone.now() + datetime.timedelta(seconds=ttl)
+        self._tokens.update_or_create(
+            user_id=user_id, reason=reason, defaults={"token": token, "expires": expires}
+        )
+
+    def touch(self, user_id: int, reason: str, ttl: int) -> bool:
+        expires = timezone.now() + datetime.timedelta(seconds=ttl)
+        return bool(self._live(user_id, reason).update(expires=expires))
+
+    def delete(self, user_id: int, reason: str) -> None:
+        self._tokens.filter(user_id=user_id, reason=reason).delete()
+
+    def purge_expired(self) -> int:
+        return self._tokens.filter(expires__lte=timezone.now()).delete()[0]
+
+
+@functools.cache
+def get_store() -> TokenStore:
+    """The store named by ``VERIFICATION_TOKEN_STORE`` (``redis``, ``database``, ``memory``)."""
+    match settings.VERIFICATION_TOKEN_STORE:
+        case "redis":
+            return RedisTokenStore(settings.VERIFICATION_TOKEN_REDIS_URL)
+        case "database":
+            return DatabaseTokenStore()
+        case "memory":
+            return MemoryTokenStore()
+        case backend:
+            raise ValueError(f"Unknown verification token store: {backend}")
@@ -9,4 +9,5 @@ urlpatterns = [
     path("user/profile/", user_profile, name="user_profile"),
     path("token/refresh/", get_access_token, name="token_refresh"),
     path("user/authenticated/", is_authenticated, name="user_authenticated"),
+    path("rate-limits/stats/", get_rate_limit_stats, name="rate_limit_stats"),
 ]
@@ -2,18 +2,19 @@ from __future__ import annotations
 
 from django.conf import settings
 from django.views.decorators.csrf import csrf_exempt
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, permission_classes, throttle_classes
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.request import Request
 from rest_framework.response import Response
+from rest_framework_simplejwt.settings import api_settings
 
-from rest_framework_simplejwt.tokens import RefreshToken
-
-
+from .middleware import ClaimsRefreshToken
 from .serializers import AuthAccSerializer
 from .models import AuthAcc, AuthAccManager, VerificationToken, authenticate
+from .ratelimit import LoginThrottle, RegisterThrottle, VerifyThrottle, stats as rate_limit_stats
+from .tasks import send_email
 
-from custom import sendmail, get_template, debug
+from custom import IsStaff, StepTimer, get_template, debug
 
 from dotenv import load_dotenv
 import os
@@ -29,6 +30,7 @@ BASE_URL = os.getenv("BASE_URL", "http://localhost:8000")
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([RegisterThrottle])
 def register(request: Request):
     """
     Register a new user.
@@ -53,7 +55,7 @@ def register(request: Request):
             type="email_verification",
         )
 
-        sendmail(user.email, "Skyntel Email Verification", mail_template)
+        send_email.delay(user.email, "Skyntel Email Verification", mail_template)
 
         return Response(
             {"message": f"Verification Email Sent To {user.email}", "user_id": user.id},
@@ -65,6 +67,7 @@ def register(request: Request):
 @csrf_exempt
 @api_view(["POST"])
 @permission_classes([AllowAny])
+@throttle_classes([LoginThrottle])
 def login(request: Request):
     """
     Login a user.
@@ -79,8 +82,9 @@ def login(request: Request):
     if not email or not password:
         return Response({"error": "Email and password are required"}, status=400)
 
+    timer = StepTimer()
     try:
-        user = authenticate(email=email, password=password)
+        user = authenticate(email=email, password=password, timer=timer)
     except ValueError:
         user = AuthAcc.objects.filter(email=email).first()
         tokengen = VerificationToken(user=user, reason="email_verification")
@@ -95,18 +99,21 @@ def login(request: Request):
             type="email_verification",
         )
 
-        sendmail(user.email, "Skyntel Email Verification", mail_template)
+        send_email.delay(user.email, "Skyntel Email Verification", mail_template)
         return Response(
             {"error": f"User Not Verified. Verification Email Sent To {user.email}"},
             status=201,
         )
 
     if not user:
-        return Response({"error": "Invalid credentials"}, status=400)
+        return _with_timings(Response({"error": "Invalid credentials"}, status=400), timer)
 
-    user.set_last_login()
+    with timer.step("last_login"):
+        user.set_last_login()
 
-    refresh = RefreshToken.for_user(user)
+    with timer.step("issue_tokens"):
+        refresh = ClaimsRefreshToken.for_user(user)
+        access = refresh.access_token
 
     # Create response
     response = Response(
@@ -130,18 +137,26 @@ def login(request: Request):
     
     response.set_cookie(
         'access_token', 
-        str(refresh.access_token),
+        str(access),
         max_age=60 * 5,  # 5 minutes
         httponly=True,
         secure=not settings.DEBUG,  # Use HTTPS in production only
         samesite='Lax'
     )
     
+    return _with_timings(response, timer)
+
+
+def _with_timings(response: Response, timer: StepTimer) -> Response:
+    """Report the login steps in a ``Server-Timing`` header when enabled."""
+    if settings.LOGIN_SERVER_TIMING:
+        response["Server-Timing"] = timer.server_timing()
     return response
 
 
 @api_view(["GET"])
 @permission_classes([AllowAny])
+@throttle_classes([VerifyThrottle])
 def verify(request: Request):
     """
     Verify the user's email using the token.
@@ -209,7 +224,10 @@ def user_profile(request: Request):
     """
     Get the authenticated user's profile.
     """
-    user = request.user
+    # Token-backed users only carry their claims, the profile needs the full model
+    user = getattr(request.user, "instance", request.user)
+    if user is None:
+        return Response({"error": "User not found"}, status=404)
     serializer = AuthAccSerializer(user)
     return Response(serializer.data, status=200)
 
@@ -248,7 +266,7 @@ def logout(request: Request):
         # Try to blacklist the refresh token if it exists and is valid
         if refresh_token:
             try:
-                RefreshToken(refresh_token).blacklist()
+                ClaimsRefreshToken(refresh_token).blacklist()
             except Exception as e:
                 # Token might already be invalid/blacklisted, which is fine for logout
                 debug(f"Token blacklist failed (this is OK for logout): {e}")
@@ -270,11 +288,16 @@ def get_access_token(request: Request):
         if not refresh_token:
             return Response({"error": "Refresh token is required"}, status=400)
         try:
-            refresh = RefreshToken(refresh_token)
+            refresh = ClaimsRefreshToken(refresh_token)
         except Exception:
             return Response({"error": "Invalid refresh token"}, status=400)
-        
-        access_token = str(refresh.access_token)
+
+        # Reload the user, so deactivation stops refreshes and the claims are current
+        user = AuthAcc.objects.filter(pk=refresh.payload.get(api_settings.USER_ID_CLAIM)).first()
+        if user is None or not user.is_active:
+            return Response({"error": "User is inactive or does not exist"}, status=401)
+
+        access_token = str(refresh.access_token_for(user))
 
         # Create response and set new access token cookie
         response = Response({"access": access_token}, status=200)
@@ -304,3 +327,12 @@ def is_authenticated(request: Request):
         "email": request.user.email,
         "authenticated": True
     }, status=200)
+
+
+@api_view(["GET"])
+@permission_classes([IsStaff])
+def get_rate_limit_stats(request: Request):
+    """
+    Get the number of rate limited requests per endpoint and key.
+    """
+    return Response(rate_limit_stats(), status=200)
@@ -25,16 +25,8 @@ export default function DashboardPage() {
     fetchReport();
   }, []);
 
-  const getCategoryBreakdown = (details, type) => {
-    const categoryMap = {};
-    details.forEach(item => {
-      const category = item.category__name || 'Uncategorized';
-      if (!categoryMap[category]) {
-        categoryMap[category] = 0;
-      }
-      categoryMap[category] += item.amount;
-    });
-    return Object.entries(categoryMap).sort((a, b) => b[1] - a[1]);
+  const getCategoryBreakdown = (breakdown) => {
+    return breakdown.map(item => [item.category__name || 'Uncategorized', item.total]);
   };
 
   if (loading) {
@@ -56,8 +48,8 @@ export default function DashboardPage() {
     );
   }
 
-  const incomeBreakdown = reportData ? getCategoryBreakdown(reportData.income_details, 'income') : [];
-  const expenseBreakdown = reportData ? getCategoryBreakdown(reportData.expense_details, 'expense') : [];
+  const incomeBreakdown = reportData ? getCategoryBreakdown(reportData.income_by_category) : [];
+  const expenseBreakdown = reportData ? getCategoryBreakdown(reportData.expense_by_category) : [];
 
   return (
     <div className="min-h-screen p-6 relative z-10">
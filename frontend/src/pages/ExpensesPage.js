@@ -6,6 +6,8 @@ import Input from '../components/elements/Input';
 
 export default function ExpensesPage() {
   const [expenses, setExpenses] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [categories, setCategories] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -21,12 +23,26 @@ export default function ExpensesPage() {
   const fetchExpenses = async () => {
     const response = await getExpenses();
     if (response.ok) {
-      setExpenses(response.data || []);
+      setExpenses(response.data?.results || []);
+      setNextCursor(response.data?.next || null);
     } else {
       setError(response.error?.message || 'Failed to fetch expenses');
     }
   };
 
+  // Append the page after the ones shown, following the `next` cursor
+  const loadMore = async () => {
+    setLoadingMore(true);
+    const response = await getExpenses(nextCursor);
+    if (response.ok) {
+      setExpenses((shown) => [...shown, ...(response.data?.results || [])]);
+      setNextCursor(response.data?.next || null);
+    } else {
+      setError(response.error?.message || 'Failed to fetch expenses');
+    }
+    setLoadingMore(false);
+  };
+
   const fetchCategories = async () => {
     const response = await getCategories();
     if (response.ok) {
@@ -209,6 +225,14 @@ export default function ExpensesPage() {
             </table>
           </div>
 
+          {nextCursor && (
+            <div className="flex justify-center py-4 border-t border-white/10">
+              <Button variant="ghost" onClick={loadMore} loading={loadingMore}>
+                Load more
+              </Button>
+            </div>
+          )}
+
           {expenses.length === 0 && (
             <div className="text-center text-gray-400 py-12">
               <p className="text-xl">No expense records found. Add your first expense!</p>
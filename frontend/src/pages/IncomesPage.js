@@ -6,6 +6,8 @@ import Input from '../components/elements/Input';
 
 export default function IncomesPage() {
   const [incomes, setIncomes] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [categories, setCategories] = useState([]);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
@@ -21,12 +23,26 @@ export default function IncomesPage() {
   const fetchIncomes = async () => {
     const response = await getIncomes();
     if (response.ok) {
-      setIncomes(response.data || []);
+      setIncomes(response.data?.results || []);
+      setNextCursor(response.data?.next || null);
     } else {
       setError(response.error?.message || 'Failed to fetch incomes');
     }
   };
 
+  // Append the page after the ones shown, following the `next` cursor
+  const loadMore = async () => {
+    setLoadingMore(true);
+    const response = await getIncomes(nextCursor);
+    if (response.ok) {
+      setIncomes((shown) => [...shown, ...(response.data?.results || [])]);
+      setNextCursor(response.data?.next || null);
+    } else {
+      setError(response.error?.message || 'Failed to fetch incomes');
+    }
+    setLoadingMore(false);
+  };
+
   const fetchCategories = async () => {
     const response = await getCategories();
     if (response.ok) {
@@ -209,6 +225,14 @@ export default function IncomesPage() {
             </table>
           </div>
 
+          {nextCursor && (
+            <div className="flex justify-center py-4 border-t border-white/10">
+              <Button variant="ghost" onClick={loadMore} loading={loadingMore}>
+                Load more
+              </Button>
+            </div>
+          )}
+
           {incomes.length === 0 && (
             <div className="text-center text-gray-400 py-12">
               <p className="text-xl">No income records found. Add your first income!</p>
@@ -44,21 +44,15 @@ export default function ReportsPage() {
     );
   }
 
-  const categoryBreakdown = (details) => {
-    const categoryMap = {};
-    details.forEach(item => {
-      const category = item.category__name || 'Uncategorized';
-      if (!categoryMap[category]) {
-        categoryMap[category] = { total: 0, count: 0 };
-      }
-      categoryMap[category].total += item.amount;
-      categoryMap[category].count += 1;
-    });
-    return Object.entries(categoryMap).sort((a, b) => b[1].total - a[1].total);
+  const categoryBreakdown = (breakdown) => {
+    return breakdown.map(item => [
+      item.category__name || 'Uncategorized',
+      { total: item.total, count: item.count }
+    ]);
   };
 
-  const incomeBreakdown = reportData ? categoryBreakdown(reportData.income_details) : [];
-  const expenseBreakdown = reportData ? categoryBreakdown(reportData.expense_details) : [];
+  const incomeBreakdown = reportData ? categoryBreakdown(reportData.income_by_category) : [];
+  const expenseBreakdown = reportData ? categoryBreakdown(reportData.expense_by_category) : [];
 
   return (
     <div className="min-h-screen p-6 relative z-10">
@@ -161,7 +155,7 @@ export default function ReportsPage() {
           <div className="bg-white/10 backdrop-blur-lg rounded-2xl p-6 border border-white/20 shadow-xl">
             <h2 className="text-2xl font-bold text-white mb-4">Recent Income</h2>
             <div className="space-y-2">
-              {reportData?.income_details.slice(0, 5).map((income, index) => (
+              {reportData?.recent_income.map((income, index) => (
                 <div key={index} className="flex justify-between items-center bg-white/5 rounded-lg p-3 border border-white/10">
                   <div>
                     <p className="text-white font-medium">{income.category__name || 'Uncategorized'}</p>
@@ -170,7 +164,7 @@ export default function ReportsPage() {
                   <span className="text-green-400 font-bold">+${income.amount.toFixed(2)}</span>
                 </div>
               ))}
-              {reportData?.income_details.length === 0 && (
+              {reportData?.recent_income.length === 0 && (
                 <p className="text-gray-400 text-center py-4">No recent income</p>
               )}
             </div>
@@ -180,7 +174,7 @@ export default function ReportsPage() {
           <div className="bg-white/10 backdrop-blur-lg rounded-2xl p-6 border border-white/20 shadow-xl">
             <h2 className="text-2xl font-bold text-white mb-4">Recent Expenses</h2>
             <div className="space-y-2">
-              {reportData?.expense_details.slice(0, 5).map((expense, index) => (
+              {reportData?.recent_expense.map((expense, index) => (
                 <div key={index} className="flex justify-between items-center bg-white/5 rounded-lg p-3 border border-white/10">
                   <div>
                     <p className="text-white font-medium">{expense.category__name || 'Uncategorized'}</p>
@@ -189,7 +183,7 @@ export default function ReportsPage() {
                   <span className="text-red-400 font-bold">-${expense.amount.toFixed(2)}</span>
                 </div>
               ))}
-              {reportData?.expense_details.length === 0 && (
+              {reportData?.recent_expense.length === 0 && (
                 <p className="text-gray-400 text-center py-4">No recent expenses</p>
               )}
             </div>
@@ -18,8 +18,10 @@ export const deleteCategory = async (categoryId) => {
 };
 
 // Incomes API
-export const getIncomes = async () => {
-  return await apiGetAuth(`${API_BASE_URL}/api/incomes/`);
+// Pass the `next` cursor of a page to get the page after it
+export const getIncomes = async (cursor) => {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  return await apiGetAuth(`${API_BASE_URL}/api/incomes/${query}`);
 };
 
 export const createIncome = async (incomeData) => {
@@ -33,8 +35,10 @@ export const deleteIncome = async (incomeId) => {
 };
 
 // Expenses API
-export const getExpenses = async () => {
-  return await apiGetAuth(`${API_BASE_URL}/api/expenses/`);
+// Pass the `next` cursor of a page to get the page after it
+export const getExpenses = async (cursor) => {
+  const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : '';
+  return await apiGetAuth(`${API_BASE_URL}/api/expenses/${query}`);
 };
 
 export const createExpense = async (expenseData) => {